@@ -1,32 +1,88 @@
-import argparse, sys
+import argparse, atexit, sys
 import os
 os.environ.setdefault("QT_QPA_PLATFORM", "xcb")
 
+def _profile_summary(prof, trace=None):
+    print(prof.format_report(), file=sys.stderr)
+    if trace: print(f"trace -> {prof.export_trace(trace)}", file=sys.stderr)
+
 def main():
     parser = argparse.ArgumentParser(description="Manual Backtester — Phase 2 (orders/fills/P&L)")
     parser.add_argument("--csv", type=str, default="backtester_p2/data/sample.csv")
-    parser.add_argument("--mode", choices=["auto","gui","cli"], default="cli")
+    parser.add_argument("--mode", choices=["auto","gui","cli","sweep","montecarlo"], default="cli")
     parser.add_argument("--cash", type=float, default=100000.0)
     parser.add_argument("--fee_bps", type=float, default=1.0)
     parser.add_argument("--slip_bps", type=float, default=2.0)
     parser.add_argument("--policy", choices=["next_open","bar_inclusive"], default="next_open")
+    parser.add_argument("--cache_dir", type=str, default=None, help="parsed-data cache (default: $BACKTESTER_CACHE_DIR or ~/.cache/backtester_p2)")
+    parser.add_argument("--no_cache", action="store_true")
+    parser.add_argument("--timeframe", type=str, default="D", help="bar timeframe recorded in the manifest")
+    parser.add_argument("--stream", action="store_true", help="chunked ingest, resampled to --timeframe while reading")
+    parser.add_argument("--chunksize", type=int, default=500_000)
+    parser.add_argument("--play_rate", type=float, default=200.0, help="GUI autoplay speed in bars/s (Space toggles play)")
+    parser.add_argument("--fps", type=float, default=30.0, help="GUI autoplay redraws per second at most")
+    parser.add_argument("--compact", action="store_true", help="float32 prices and indicators in the GUI (about half the memory)")
+    parser.add_argument("--orders", type=str, default=None, help="order journal (.json/.jsonl/.csv) for headless replay")
+    parser.add_argument("--intrabar", type=str, default=None, help="lower-timeframe CSV to resolve fills inside each bar")
+    parser.add_argument("--out", type=str, default=None, help="write the replay result JSON here instead of stdout")
+    parser.add_argument("--sweep_fee_bps", type=str, default=None, help="comma list, e.g. 0,1,2")
+    parser.add_argument("--sweep_slip_bps", type=str, default=None)
+    parser.add_argument("--sweep_policy", type=str, default=None, help="e.g. next_open,bar_inclusive")
+    parser.add_argument("--sweep_sma", type=str, default="20,50,200")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=42, help="manifest seed; drives anonymized / resampled paths")
+    parser.add_argument("--mc_paths", type=int, default=1000)
+    parser.add_argument("--mc_block", type=int, default=20, help="bootstrap block length in bars")
+    parser.add_argument("--mc_sma", type=int, default=50)
+    parser.add_argument("--profile", action="store_true", help="time loader/indicators/broker/chart and print a summary on exit")
+    parser.add_argument("--trace", type=str, default=None, help="also write a Chrome trace (.json) of the profiled spans")
+    parser.add_argument("--store", type=str, default=None, help="save runs (cli/sweep) to this run store directory")
+    parser.add_argument("--rank_by", choices=["equity","sharpe","sortino","cagr","expectancy"], default="equity")
     args = parser.parse_args()
 
+    from backtester_p2.engine.instrument import PROF
+    if args.profile or args.trace:
+        PROF.enable(); atexit.register(_profile_summary, PROF, args.trace)
+
     from backtester_p2.io.csv_loader import load_ohlcv
     from backtester_p2.store.manifest import Manifest
     from backtester_p2.sim.config import SimConfig
+    from backtester_p2.io.cache import DEFAULT_CACHE_DIR
+    cache_dir = None if args.no_cache else (args.cache_dir or DEFAULT_CACHE_DIR)
 
-    df, meta = load_ohlcv(args.csv)
-    manifest = Manifest.create("SAMPLE", "D", meta, {"sma":[20,50,200]}, 42)
+    with PROF.span("load"):
+        if args.stream:
+            from backtester_p2.io.stream import stream_ohlcv, frame_from_columns
+            cols, meta = stream_ohlcv(args.csv, chunksize=args.chunksize, timeframe=args.timeframe)
+            df = frame_from_columns(cols)
+        else:
+            df, meta = load_ohlcv(args.csv, cache_dir=cache_dir)
+    manifest = Manifest.create("SAMPLE", args.timeframe, meta, {"sma":[20,50,200]}, args.seed)
     cfg = SimConfig(cash=args.cash, fee_bps=args.fee_bps, slip_bps=args.slip_bps, policy=args.policy)
 
     mode = args.mode
+    if mode == "sweep":
+        from backtester_p2.sim.sweep import param_grid
+        from backtester_p2.ui.cli import run_sweep_cli
+        axes = {"sma": [int(x) for x in args.sweep_sma.split(",")]}
+        if args.sweep_fee_bps: axes["fee_bps"] = [float(x) for x in args.sweep_fee_bps.split(",")]
+        if args.sweep_slip_bps: axes["slip_bps"] = [float(x) for x in args.sweep_slip_bps.split(",")]
+        if args.sweep_policy: axes["policy"] = args.sweep_policy.split(",")
+        run_sweep_cli(df, manifest, cfg, param_grid(**axes), workers=args.workers, rank_by=args.rank_by, store=args.store)
+        return
+    if mode == "montecarlo":
+        from backtester_p2.ui.cli import run_montecarlo_cli
+        run_montecarlo_cli(df, manifest, cfg, n_paths=args.mc_paths, block=args.mc_block, sma=args.mc_sma)
+        return
     if mode in ("auto","gui"):
         try:
             from PySide6 import QtWidgets
             from backtester_p2.ui.chart import ChartWindow
             app = QtWidgets.QApplication(sys.argv)
-            win = ChartWindow(df, manifest, cfg)
+            if args.compact:
+                from backtester_p2.engine.shared import COMPACT, as_columns
+                df = as_columns(df, meta, COMPACT)["df"]
+            win = ChartWindow(df, manifest, cfg, play_rate=args.play_rate, fps=args.fps)
             win.setWindowTitle("Manual Backtester — Phase 2 GUI")
             win.show()
             sys.exit(app.exec())
@@ -36,7 +92,12 @@ def main():
             mode = "cli"
     if mode == "cli":
         from backtester_p2.ui.cli import run_cli
-        run_cli(df, manifest, cfg)
+        sub = None
+        if args.intrabar:
+            from backtester_p2.sim.intrabar import from_frames
+            with PROF.span("load"):
+                sub = from_frames(df, load_ohlcv(args.intrabar, cache_dir=cache_dir)[0])
+        run_cli(df, manifest, cfg, orders=args.orders, out=args.out, intrabar=sub, store=args.store)
 
 if __name__ == "__main__":
     main()
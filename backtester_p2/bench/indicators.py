@@ -0,0 +1,38 @@
+import argparse, time
+import numpy as np
+
+from backtester_p2.engine.indicators import sma, sma_multi, std_multi, rolling_max, bollinger, macd
+
+# Multi-period indicator throughput, reported as bar-periods per second.
+
+def _time(fn, *a, **kw):
+    t0 = time.perf_counter(); out = fn(*a, **kw); return time.perf_counter() - t0, out
+
+def run(n_bars, n_periods, dtype=np.float32, seed=0):
+    x = 100 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0, 0.001, n_bars)))
+    periods = np.linspace(5, 200, n_periods).astype(int)
+    res = {"bars": n_bars, "periods": n_periods, "dtype": np.dtype(dtype).name}
+    dt, out = _time(sma_multi, x, periods, dtype=dtype); del out
+    res["sma_multi_s"] = dt; res["sma_multi_bar_periods_per_s"] = n_bars * n_periods / dt
+    k = min(5, n_periods)
+    dt, _ = _time(lambda: [sma(x, int(n)) for n in periods[:k]])
+    res["sma_loop_bar_periods_per_s"] = n_bars * k / dt
+    dt, out = _time(std_multi, x, periods, dtype=dtype); del out
+    res["std_multi_s"] = dt
+    res["rolling_max_200_s"], _ = _time(rolling_max, x, 200)
+    res["bollinger_20_s"], _ = _time(bollinger, x, 20, 2.0)
+    res["macd_s"], _ = _time(macd, x)
+    return res
+
+def main():
+    ap = argparse.ArgumentParser(description="Multi-period indicator benchmark")
+    ap.add_argument("--bars", type=int, default=10_000_000)
+    ap.add_argument("--periods", type=int, default=50)
+    ap.add_argument("--float64", action="store_true", help="float64 output (needs bars*periods*8 bytes)")
+    a = ap.parse_args()
+    r = run(a.bars, a.periods, np.float64 if a.float64 else np.float32)
+    for k, v in r.items():
+        print(f"{k:>30}: {v:,.3f}" if isinstance(v, float) else f"{k:>30}: {v}")
+
+if __name__ == "__main__":
+    main()
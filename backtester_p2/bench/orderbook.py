@@ -0,0 +1,53 @@
+import argparse, time
+import numpy as np
+
+from backtester_p2.sim.broker import Broker
+from backtester_p2.sim.config import SimConfig
+from backtester_p2.sim.orders import Order, OrderType, Side
+
+# Resting-order benchmark: a symmetric ladder of LIMIT/STOP orders around the start price,
+# then a random walk over the bars. Only orders the walk reaches are ever touched.
+
+def random_walk(n_bars, seed=0, start=100.0, vol=0.001):
+    rng = np.random.default_rng(seed)
+    c = start * np.exp(np.cumsum(rng.normal(0, vol, n_bars)))
+    o = np.r_[start, c[:-1]]
+    spread = np.abs(rng.normal(0, vol / 2, n_bars))
+    return o, np.maximum(o, c) * (1 + spread), np.minimum(o, c) * (1 - spread), c
+
+def ladder(n_orders, start=100.0, width=0.5):
+    steps = np.linspace(0.001, width, n_orders // 4)
+    out = []
+    for k, d in enumerate(steps):
+        out.append(Order(0, Side.BUY, 1.0, OrderType.LIMIT, limit_price=start * (1 - d)))
+        out.append(Order(0, Side.SELL, 1.0, OrderType.LIMIT, limit_price=start * (1 + d)))
+        out.append(Order(0, Side.BUY, 1.0, OrderType.STOP, stop_price=start * (1 + d)))
+        out.append(Order(0, Side.SELL, 1.0, OrderType.STOP, stop_price=start * (1 - d)))
+    return out
+
+def run(n_orders, n_bars, seed=0, checkpoint_every=0):
+    o, h, l, c = random_walk(n_bars, seed)
+    b = Broker(SimConfig(cash=1e9, fee_bps=1.0, slip_bps=2.0, policy="next_open"), checkpoint_every=checkpoint_every)
+    t0 = time.perf_counter()
+    for od in ladder(n_orders): b.place(od)
+    t1 = time.perf_counter()
+    process = b.process_bar
+    for i in range(n_bars):
+        process(i, o[i], h[i], l[i], c[i])
+    t2 = time.perf_counter()
+    return {"orders": n_orders, "bars": n_bars, "place_s": t1 - t0, "run_s": t2 - t1,
+            "bars_per_sec": n_bars / (t2 - t1), "filled": n_orders - len(b.book), "resting": len(b.book)}
+
+def main():
+    ap = argparse.ArgumentParser(description="Resting order book benchmark")
+    ap.add_argument("--orders", type=int, default=100_000)
+    ap.add_argument("--bars", type=int, default=1_000_000)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--checkpoint_every", type=int, default=0)
+    a = ap.parse_args()
+    r = run(a.orders, a.bars, a.seed, a.checkpoint_every)
+    print(f"{r['orders']:,} orders placed in {r['place_s']:.2f}s; {r['bars']:,} bars in {r['run_s']:.2f}s "
+          f"({r['bars_per_sec']:,.0f} bars/s); filled {r['filled']:,}, resting {r['resting']:,}")
+
+if __name__ == "__main__":
+    main()
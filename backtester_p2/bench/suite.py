@@ -0,0 +1,190 @@
+import argparse, fnmatch, json, os, platform, shutil, sys, tempfile, time
+from datetime import datetime
+import numpy as np, pandas as pd
+
+from backtester_p2.bench.synth import write_csv
+from backtester_p2.bench.orderbook import ladder
+from backtester_p2.engine.indicators import sma, rsi, sma_multi, keltner
+from backtester_p2.io.csv_loader import load_ohlcv
+from backtester_p2.io.stream import stream_ohlcv
+from backtester_p2.sim.analytics import summary
+from backtester_p2.sim.broker import Broker
+from backtester_p2.sim.config import SimConfig
+from backtester_p2.sim.strategy import Strategy, SmaTrend, run_strategy
+from backtester_p2.sim.vector import run_vectorized
+from backtester_p2.ui.figure import chart_series, build_figure, update_figure
+from backtester_p2.ui.viewport import window_bounds
+
+# Hot-path benchmark suite over seeded synthetic data.
+#   python -m backtester_p2.bench.suite run --bars 1000,100000,1000000 --out baseline.json
+#   python -m backtester_p2.bench.suite compare baseline.json [current.json] --threshold 0.15
+# `compare` without a current file re-runs the baseline's cases and sizes first. A case
+# regresses when it is slower than the baseline by more than its threshold and by more than
+# --floor seconds (so sub-millisecond jitter is ignored); any regression exits with status 1.
+
+CFG = SimConfig(cash=1e9, fee_bps=1.0, slip_bps=2.0, policy="next_open")
+
+def _ready(fn):
+    return lambda: fn
+
+def _broker_loop(a, n_orders):
+    def prepare():
+        b = Broker(CFG, checkpoint_every=0)
+        # ladder() is centred on 100, the synthetic start price
+        for od in ladder(n_orders): b.place(od)
+        o, h, l, c = a["o"], a["h"], a["l"], a["c"]; process = b.process_bar
+        def go():
+            for i in range(len(c)): process(i, o[i], h[i], l[i], c[i])
+        return go
+    return prepare
+
+class _UpCount(Strategy):
+    # trivial path-dependent logic: count up-closes, buy one unit every 1000th
+    def start(self, ctx): self.k = 0
+    def on_bar(self, ctx):
+        if ctx.c[ctx.i] > ctx.o[ctx.i]:
+            self.k += 1
+            if self.k % 1000 == 0: ctx.buy(1)
+
+def _chart(a, full, update):
+    def prepare():
+        lo, hi = window_bounds(len(a["c"]) - 1, None if full else 300)
+        fig = build_figure(chart_series(a["chart"], lo, hi, 1500)) if update else None
+        def go():
+            s = chart_series(a["chart"], lo, hi, 1500)
+            if fig is None: build_figure(s)
+            else: update_figure(fig, s)
+        return go
+    return prepare
+
+def cases(csv, cache_dir, df):
+    a = {"o": df["Open"].tolist(), "h": df["High"].tolist(), "l": df["Low"].tolist(), "c": df["Close"].tolist()}
+    O, H, L, C = (df[k].to_numpy(float) for k in ("Open", "High", "Low", "Close"))
+    mid, up, dn = keltner(H, L, C)
+    s20, s50, s200 = sma_multi(C, [20, 50, 200])
+    a["chart"] = {"dates": df["Date"].to_numpy(), "open": O, "high": H, "low": L, "close": C,
+                  "vol": df["Volume"].to_numpy(float), "sma20": s20, "sma50": s50, "sma200": s200,
+                  "kc_mid": mid, "kc_up": up, "kc_dn": dn}
+    target = np.where(C > s50, 1.0, 0.0)
+    vr = run_vectorized(O, H, L, C, target, CFG)
+    load_ohlcv(csv, cache_dir=cache_dir)                       # warm the cache for load_cached
+    return {
+        "load_csv": _ready(lambda: load_ohlcv(csv)),
+        "load_cached": _ready(lambda: load_ohlcv(csv, cache_dir=cache_dir)),
+        "stream_csv": _ready(lambda: stream_ohlcv(csv)),
+        "sma_20": _ready(lambda: sma(C, 20)),
+        "rsi_14": _ready(lambda: rsi(C, 14)),
+        "sma_multi_3": _ready(lambda: sma_multi(C, [20, 50, 200])),
+        "keltner": _ready(lambda: keltner(H, L, C)),
+        "process_bar_0": _broker_loop(a, 0),
+        "process_bar_1k": _broker_loop(a, 1_000),
+        "process_bar_100k": _broker_loop(a, 100_000),
+        "strategy_trivial": _ready(lambda: run_strategy(_UpCount(), O, H, L, C, CFG)),
+        "strategy_sma": _ready(lambda: run_strategy(SmaTrend(50), O, H, L, C, CFG)),
+        "run_vectorized": _ready(lambda: run_vectorized(O, H, L, C, target, CFG)),
+        "analytics_summary": _ready(lambda: summary(vr.equity, vr.pos, C, vr.pnl_realized)),
+        "figure_build": _chart(a, False, False),
+        "figure_update": _chart(a, False, True),
+        "figure_full_history": _chart(a, True, True),
+    }
+
+def _time(prepare, repeat, budget):
+    best = float("inf"); spent = 0.0
+    for _ in range(repeat):
+        go = prepare()
+        t0 = time.perf_counter(); go(); dt = time.perf_counter() - t0
+        best = min(best, dt); spent += dt
+        if spent > budget: break                    # slow cases get fewer repeats
+    return best
+
+def run(sizes, patterns=("*",), seed=0, repeat=5, budget=2.0, log=lambda m: print(m, file=sys.stderr)):
+    results = {}
+    tmp = tempfile.mkdtemp(prefix="bt_bench_")
+    try:
+        for n in sizes:
+            csv = write_csv(os.path.join(tmp, f"synth_{n}.csv"), n, seed)
+            df, _ = load_ohlcv(csv)
+            table = cases(csv, os.path.join(tmp, "cache"), df)
+            for name in (c for c in table if any(fnmatch.fnmatch(c, p) for p in patterns)):
+                dt = _time(table[name], repeat, budget)
+                results[f"{name}@{n}"] = {"case": name, "bars": n, "seconds": dt, "ns_per_bar": dt / n * 1e9}
+                log(f"{name:>22} @ {n:>10,}: {dt * 1e3:12.3f} ms  {dt / n * 1e9:10.1f} ns/bar")
+            shutil.rmtree(os.path.join(tmp, "cache"), ignore_errors=True); os.remove(csv)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    meta = {"created_at": datetime.utcnow().isoformat(), "seed": seed, "repeat": repeat, "sizes": list(sizes),
+            "cases": list(patterns), "python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+            "machine": platform.machine(), "platform": platform.platform(), "cpus": os.cpu_count()}
+    return {"meta": meta, "results": results}
+
+def _threshold(case, default, overrides):
+    for pat, t in overrides.items():
+        if fnmatch.fnmatch(case, pat): return t
+    return default
+
+def compare(base, cur, threshold=0.10, overrides=None, floor=1e-3):
+    rows = []
+    for key, b in base["results"].items():
+        c = cur["results"].get(key)
+        if c is None: continue
+        t = _threshold(b["case"], threshold, overrides or {})
+        ratio = c["seconds"] / b["seconds"] if b["seconds"] > 0 else float("inf")
+        bad = ratio > 1 + t and c["seconds"] - b["seconds"] > floor
+        rows.append({"key": key, "base": b["seconds"], "current": c["seconds"], "ratio": ratio, "threshold": t, "regressed": bad})
+    return rows
+
+def _sizes(s): return [int(float(x)) for x in s.split(",")]
+
+def _overrides(items):
+    out = {}
+    for it in items or ():
+        pat, _, t = it.partition("="); out[pat] = float(t)
+    return out
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Backtester hot-path benchmarks")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("run")
+    r.add_argument("--bars", type=_sizes, default=_sizes("1000,100000,1000000"), help="comma list, e.g. 1e3,1e5,1e7")
+    r.add_argument("--cases", type=str, default="*", help="comma list of case globs")
+    r.add_argument("--seed", type=int, default=0)
+    r.add_argument("--repeat", type=int, default=5)
+    r.add_argument("--budget", type=float, default=2.0, help="stop repeating a case after this many seconds")
+    r.add_argument("--out", type=str, default=None)
+    c = sub.add_parser("compare")
+    c.add_argument("baseline")
+    c.add_argument("current", nargs="?", default=None)
+    c.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown, 0.10 = 10%%")
+    c.add_argument("--case_threshold", action="append", help="per-case override, e.g. figure_*=0.3")
+    c.add_argument("--floor", type=float, default=1e-3, help="ignore slowdowns smaller than this many seconds")
+    c.add_argument("--repeat", type=int, default=5)
+    c.add_argument("--out", type=str, default=None, help="save the fresh run when no current file is given")
+    a = ap.parse_args(argv)
+
+    if a.cmd == "run":
+        res = run(a.bars, a.cases.split(","), a.seed, a.repeat, a.budget)
+        text = json.dumps(res, indent=2)
+        if a.out:
+            with open(a.out, "w") as f: f.write(text)
+        else: print(text)
+        return 0
+
+    with open(a.baseline) as f: base = json.load(f)
+    if a.current:
+        with open(a.current) as f: cur = json.load(f)
+    else:
+        m = base["meta"]
+        cur = run(m["sizes"], m["cases"], m["seed"], a.repeat)
+        if a.out:
+            with open(a.out, "w") as f: json.dump(cur, f, indent=2)
+    rows = compare(base, cur, a.threshold, _overrides(a.case_threshold), a.floor)
+    print(f"\n{'case':>34}  {'baseline':>12}  {'current':>12}  {'ratio':>7}  {'limit':>6}")
+    for row in rows:
+        flag = "  REGRESSION" if row["regressed"] else ""
+        print(f"{row['key']:>34}  {row['base'] * 1e3:10.3f}ms  {row['current'] * 1e3:10.3f}ms  {row['ratio']:7.2f}  {1 + row['threshold']:6.2f}{flag}")
+    bad = sum(r["regressed"] for r in rows)
+    print(f"\n{len(rows)} cases compared, {bad} regressed")
+    return 1 if bad else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
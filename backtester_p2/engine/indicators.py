@@ -1,4 +1,5 @@
 import numpy as np
+import pandas as pd
 
 def sma(arr, n):
     arr = np.asarray(arr, float)
@@ -8,20 +9,116 @@ def sma(arr, n):
     out[n-1:] = (cs[n:] - cs[:-n]) / n
     return out
 
+def ema(x, n):
+    return pd.Series(np.asarray(x, float)).ewm(span=n, adjust=False).mean().to_numpy()
+
+def wilder(x, n):
+    # y[0] = x[0]; y[k] = (1-1/n)*y[k-1] + x[k]/n
+    return pd.Series(np.asarray(x, float)).ewm(alpha=1.0 / n, adjust=False).mean().to_numpy()
+
+def true_range(h, l, c):
+    h = np.asarray(h, float); l = np.asarray(l, float); c = np.asarray(c, float)
+    prev_c = np.r_[c[0], c[:-1]]
+    return np.maximum(h - l, np.maximum(np.abs(h - prev_c), np.abs(l - prev_c)))
+
+def atr(h, l, c, n=10):
+    # Wilder-like smoothing via EMA(alpha=1/n)
+    return wilder(true_range(h, l, c), n)
+
+def keltner(h, l, c, n_ema=20, n_atr=10, mult=2.0):
+    mid = ema(c, n_ema); rng = mult * atr(h, l, c, n_atr)
+    return mid, mid + rng, mid - rng
+
+def rsi_averages(arr, n=14):
+    # average up/down moves: simple mean of the first n moves, then Wilder smoothing
+    diff = np.diff(np.asarray(arr, float))
+    up = np.where(diff>0, diff, 0)
+    dn = np.where(diff<0, -diff, 0)
+    avg_up = np.zeros(len(diff)); avg_dn = np.zeros(len(diff))
+    avg_up[n-1:] = wilder(np.r_[up[:n].mean(), up[n:]], n)
+    avg_dn[n-1:] = wilder(np.r_[dn[:n].mean(), dn[n:]], n)
+    return avg_up, avg_dn
+
 def rsi(arr, n=14):
     arr = np.asarray(arr, float)
     L = len(arr)
     out = np.full(L, np.nan)
-    if L<n: return out
-    diff = np.diff(arr)
-    up = np.where(diff>0, diff, 0)
-    dn = np.where(diff<0, -diff, 0)
-    avg_up = np.zeros(L-1); avg_dn = np.zeros(L-1)
-    avg_up[n-1] = up[:n].mean(); avg_dn[n-1] = dn[:n].mean()
-    alpha=1/n
-    for i in range(n, L-1):
-        avg_up[i] = (1-alpha)*avg_up[i-1] + alpha*up[i]
-        avg_dn[i] = (1-alpha)*avg_dn[i-1] + alpha*dn[i]
+    if L<=n: return out
+    avg_up, avg_dn = rsi_averages(arr, n)
     rs = avg_up/np.where(avg_dn==0, np.nan, avg_dn)
     out[1:] = 100 - 100/(1+rs)
     return out
+
+# --- multi-period kernels ---
+# One cumulative pass per input; each period then costs two vectorized array ops, so there is
+# no per-window Python work. Outputs are (len(periods), len(arr)) with NaN warm-up columns.
+# Memory is periods x bars x itemsize: 50 periods over 10M bars is 4 GB in float64 and
+# 2 GB with dtype=np.float32 (accumulation always stays float64).
+# `python -m backtester_p2.bench.indicators` measures throughput at that size.
+
+def _periods(periods):
+    return np.atleast_1d(np.asarray(periods, dtype=np.int64))
+
+def sma_multi(arr, periods, dtype=float):
+    arr = np.asarray(arr, float); P = _periods(periods); L = len(arr)
+    out = np.full((len(P), L), np.nan, dtype=dtype)
+    cs = np.cumsum(np.insert(arr,0,0)); tmp = np.empty(L)
+    for k, n in enumerate(P):
+        if n<=0 or n>L: continue
+        t = tmp[:L-n+1]
+        np.subtract(cs[n:], cs[:-n], out=t); np.divide(t, n, out=t)
+        out[k, n-1:] = t
+    return out
+
+# Rolling variance from running sums of x and x*x: the absolute error grows with the series'
+# running sum of squares (~1e-7 relative on 10M bars of prices near 100), fine for bands and
+# volatility but not for exact zero-variance tests.
+def std_multi(arr, periods, ddof=0, dtype=float):
+    arr = np.asarray(arr, float); P = _periods(periods); L = len(arr)
+    out = np.full((len(P), L), np.nan, dtype=dtype)
+    if L == 0: return out
+    x = arr - np.nanmean(arr) if np.isfinite(arr).any() else arr   # centre to limit cancellation
+    cs = np.cumsum(np.insert(x,0,0)); cs2 = np.cumsum(np.insert(x*x,0,0))
+    s_buf = np.empty(L); v_buf = np.empty(L)
+    for k, n in enumerate(P):
+        if n<=ddof or n>L: continue
+        s = s_buf[:L-n+1]; v = v_buf[:L-n+1]
+        np.subtract(cs[n:], cs[:-n], out=s); np.multiply(s, s, out=s); np.divide(s, n, out=s)
+        np.subtract(cs2[n:], cs2[:-n], out=v); np.subtract(v, s, out=v); np.divide(v, n - ddof, out=v)
+        np.maximum(v, 0.0, out=v); np.sqrt(v, out=v)
+        out[k, n-1:] = v
+    return out
+
+def rolling_std(arr, n, ddof=0):
+    return std_multi(arr, [n], ddof)[0]
+
+def _rolling_extreme(arr, n, ufunc, pad):
+    # van Herk/Gil-Werman: block-wise prefix and suffix scans, O(L) regardless of n
+    x = np.asarray(arr, float); L = len(x)
+    out = np.full(L, np.nan)
+    if n<=0 or n>L: return out
+    m = -(-L // n) * n
+    blocks = np.full(m, pad); blocks[:L] = x; blocks = blocks.reshape(-1, n)
+    pre = ufunc.accumulate(blocks, axis=1).ravel()
+    suf = ufunc.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    out[n-1:] = ufunc(suf[:L-n+1], pre[n-1:L])
+    return out
+
+def rolling_max(arr, n): return _rolling_extreme(arr, n, np.maximum, -np.inf)
+def rolling_min(arr, n): return _rolling_extreme(arr, n, np.minimum, np.inf)
+
+def bollinger(arr, n=20, k=2.0):
+    # k may be a vector of multipliers; upper/lower then come back as (len(k), len(arr))
+    mid = sma(arr, n); sd = rolling_std(arr, n)
+    k = np.asarray(k, float)
+    if k.ndim: k = k[:, None]
+    return mid, mid + k*sd, mid - k*sd
+
+def keltner_multi(h, l, c, mults, n_ema=20, n_atr=10):
+    mid = ema(c, n_ema); a = atr(h, l, c, n_atr); m = np.asarray(mults, float)[:, None]
+    return mid, mid + m*a, mid - m*a
+
+def macd(arr, fast=12, slow=26, signal=9):
+    line = ema(arr, fast) - ema(arr, slow)
+    sig = ema(line, signal)
+    return line, sig, line - sig
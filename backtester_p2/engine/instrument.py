@@ -0,0 +1,75 @@
+import json, os, threading
+from collections import deque
+from contextlib import nullcontext
+from time import perf_counter
+
+# Opt-in timers and counters. Turn on with BACKTESTER_PROFILE=1, --profile, or PROF.enable().
+# While disabled, span() hands back one shared no-op context and Broker keeps its plain
+# process_bar, so nothing is measured or stored. Per-name totals are kept for the summary
+# table; each span is also logged (up to max_events) for a Chrome trace, which opens in
+# chrome://tracing or https://ui.perfetto.dev.
+
+_NULL = nullcontext()
+
+class _Span:
+    __slots__ = ("prof", "name", "t0")
+    def __init__(self, prof, name): self.prof = prof; self.name = name
+    def __enter__(self): self.t0 = perf_counter(); return self
+    def __exit__(self, *exc): self.prof.add(self.name, perf_counter() - self.t0, self.t0)
+
+class Instrument:
+    def __init__(self, enabled=False, max_events=100_000):
+        self.enabled = enabled
+        self.events = deque(maxlen=max_events)
+        self.reset()
+
+    def enable(self, on=True): self.enabled = bool(on)
+
+    def reset(self):
+        self.stats = {}      # name -> [count, total_s, max_s]
+        self.counters = {}
+        self.events.clear(); self._origin = perf_counter()
+
+    def span(self, name):
+        return _Span(self, name) if self.enabled else _NULL
+
+    def add(self, name, dt, t0=None):
+        s = self.stats.get(name)
+        if s is None: self.stats[name] = [1, dt, dt]
+        else:
+            s[0] += 1; s[1] += dt
+            if dt > s[2]: s[2] = dt
+        if t0 is not None: self.events.append((name, t0, dt, threading.get_ident()))
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    # --- output ---
+    def report(self):
+        rows = [{"name": k, "count": n, "total_ms": t * 1e3, "mean_ms": t / n * 1e3, "max_ms": m * 1e3}
+                for k, (n, t, m) in self.stats.items()]
+        return sorted(rows, key=lambda r: -r["total_ms"])
+
+    def format_report(self):
+        lines = [f"{'span':<28} {'count':>9} {'total ms':>11} {'mean ms':>10} {'max ms':>10}"]
+        for r in self.report():
+            lines.append(f"{r['name']:<28} {r['count']:>9,} {r['total_ms']:>11.2f} {r['mean_ms']:>10.4f} {r['max_ms']:>10.3f}")
+        for k, v in sorted(self.counters.items()):
+            lines.append(f"{k:<28} {v:>9,}")
+        return "\n".join(lines)
+
+    def trace(self):
+        pid = os.getpid(); end = 0.0
+        ev = []
+        for name, t0, dt, tid in self.events:
+            ts = (t0 - self._origin) * 1e6; end = max(end, ts + dt * 1e6)
+            ev.append({"name": name, "ph": "X", "ts": ts, "dur": dt * 1e6, "pid": pid, "tid": tid})
+        if self.counters:
+            ev.append({"name": "counters", "ph": "C", "ts": end, "pid": pid, "args": dict(self.counters)})
+        return {"traceEvents": ev, "displayTimeUnit": "ms"}
+
+    def export_trace(self, path):
+        with open(path, "w") as f: json.dump(self.trace(), f)
+        return path
+
+PROF = Instrument(enabled=os.environ.get("BACKTESTER_PROFILE", "") not in ("", "0"))
@@ -0,0 +1,44 @@
+import numpy as np
+
+# Resampled price paths by moving-block bootstrap. Each bar is described relative to the
+# previous close: log gap to its open, and log high/low/close relative to that open. Blocks
+# of `block` consecutive bar shapes are drawn with replacement and chained from `start`, so
+# the level is anonymized while returns, ranges, gaps and short-range dependence (within a
+# block) follow the source. Volume travels with its bar.
+#
+# bootstrap_index() draws every path's bar indices from one seed as an (n_paths, bars) array;
+# paths_from_index() turns any rows of it into OHLCV, so callers can materialize thousands of
+# paths at once or a slice at a time and get the same paths either way.
+
+def bar_shapes(o, h, l, c):
+    o, h, l, c = (np.asarray(x, float) for x in (o, h, l, c))
+    with np.errstate(all="ignore"):
+        lo = np.log(o)
+        return {"gap": lo[1:] - np.log(c[:-1]), "high": np.log(h[1:]) - lo[1:],
+                "low": np.log(l[1:]) - lo[1:], "body": np.log(c[1:]) - lo[1:]}
+
+def bootstrap_index(n_source, n_bars, n_paths=1, seed=0, block=20):
+    # indices into the n_source - 1 bar shapes (bar 0 has no previous close)
+    m = n_source - 1
+    if m < 1: raise ValueError("need at least two bars to resample")
+    block = max(1, min(block, m))
+    nb = -(-n_bars // block)
+    rng = np.random.default_rng(seed)
+    starts = rng.integers(0, m - block + 1, size=(n_paths, nb))
+    idx = (starts[:, :, None] + np.arange(block)).reshape(n_paths, nb * block)[:, :n_bars]
+    return idx.astype(np.int32 if m < 2**31 else np.int64)
+
+def paths_from_index(shapes, idx, start=100.0, volume=None, dtype=float):
+    # idx: (paths, bars) from bootstrap_index -> dict of (paths, bars) open/high/low/close[/volume]
+    gap = shapes["gap"][idx]; body = shapes["body"][idx]
+    lc = np.log(start) + np.cumsum(gap + body, axis=-1)
+    lo = lc - body                                   # log open = previous close + gap
+    out = {"open": np.exp(lo), "high": np.exp(lo + shapes["high"][idx]),
+           "low": np.exp(lo + shapes["low"][idx]), "close": np.exp(lc)}
+    if volume is not None: out["volume"] = np.asarray(volume, float)[1:][idx]
+    return {k: v.astype(dtype, copy=False) for k, v in out.items()}
+
+def bootstrap_paths(o, h, l, c, n_paths, seed=0, block=20, n_bars=None, start=100.0, volume=None, dtype=float):
+    n_bars = len(c) if n_bars is None else n_bars
+    idx = bootstrap_index(len(c), n_bars, n_paths, seed, block)
+    return paths_from_index(bar_shapes(o, h, l, c), idx, start, volume, dtype)
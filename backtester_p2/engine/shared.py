@@ -0,0 +1,152 @@
+import os, threading
+from collections import OrderedDict
+import numpy as np, pandas as pd, xxhash
+
+from .indicators import sma_multi, ema, atr, rsi
+
+# Process-wide, read-only dataset and indicator store for multi-session front-ends (the
+# Streamlit server runs every session as a thread of one process). Parsed OHLCV columns are
+# kept once per data checksum and indicator arrays once per (checksum, params); sessions get
+# the same arrays, marked non-writeable, and keep only their own broker and cursor. Entries
+# are evicted least-recently-used past max_bytes; an evicted entry stays alive for sessions
+# still holding it and is rebuilt on the next miss. Concurrent misses for one key build once.
+#
+# Compact mode (dtype=COMPACT) stores prices, volume and indicators as float32, about half the
+# float64 footprint; the DataFrame in data["df"] is built on the same buffers as the arrays
+# (in either mode), so nothing is held twice. Indicators are still computed in float64
+# (cumulative sums, EWM recursions) and only rounded for storage; dates stay datetime64, so a
+# dataset with its default indicators takes ~0.55x the float64 bytes. Against the float64
+# path, measured on 1M synthetic bars near 100 and on the sample data:
+#   prices                              relative error <= 6e-8 (float32 rounding, 2**-24)
+#   SMA, EMA, Keltner bands             relative error < 2e-7
+#   RSI                                 absolute error < 2e-3 RSI points
+#   backtest equity (Broker/Recorder)   relative error < 1e-8 (account math stays float64)
+# Volumes above 2**24 (~1.7e7) per bar lose their exact integer value.
+
+DEFAULT_MAX_BYTES = int(os.environ.get("BACKTESTER_SHARED_MAX_BYTES", 2 * 1024**3))
+COMPACT = np.float32
+
+INDICATORS = {"sma": (20, 50, 200), "kc_ema": 20, "kc_atr": 10, "kc_mult": 2.0, "rsi": 14}
+
+def _freeze(value):
+    for v in value.values():
+        if isinstance(v, np.ndarray): v.flags.writeable = False
+    return value
+
+def _nbytes(value):
+    return sum(v.nbytes for v in value.values() if isinstance(v, np.ndarray))
+
+class SharedArrays:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._d = OrderedDict()          # key -> (value, nbytes), oldest first
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._building = {}              # key -> Event for a build in progress
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            e = self._d.get(key)
+            if e is None: return None
+            self._d.move_to_end(key); self.hits += 1
+            return e[0]
+
+    def get_or_build(self, key, build):
+        while True:
+            with self._lock:
+                e = self._d.get(key)
+                if e is not None:
+                    self._d.move_to_end(key); self.hits += 1
+                    return e[0]
+                ev = self._building.get(key)
+                if ev is None:
+                    ev = self._building[key] = threading.Event(); self.misses += 1
+                    break
+            ev.wait()                    # someone else is building it; re-check when done
+        try:
+            value = _freeze(build())
+        except BaseException:
+            with self._lock: del self._building[key]
+            ev.set(); raise
+        n = _nbytes(value)
+        with self._lock:
+            self._d[key] = (value, n); self._bytes += n
+            del self._building[key]
+            self._evict(keep=key)
+        ev.set()
+        return value
+
+    def _evict(self, keep):
+        while self._bytes > self.max_bytes and len(self._d) > 1:
+            key = next(iter(self._d))
+            if key == keep: self._d.move_to_end(key); continue
+            _, n = self._d.pop(key); self._bytes -= n; self.evictions += 1
+
+    def keys(self):
+        with self._lock: return list(self._d)
+
+    def clear(self):
+        with self._lock: self._d.clear(); self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._d), "bytes": self._bytes, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+SHARED = SharedArrays()
+_SOURCES = {}                            # source id -> data checksum, pruned with the store
+_SOURCE_LOCKS = {}
+_GUARD = threading.Lock()
+
+def _source_lock(source_id):
+    with _GUARD:
+        return _SOURCE_LOCKS.setdefault(source_id, threading.Lock())
+
+def _prune_sources(store):
+    # forget sources (e.g. one per uploaded file) whose data the store has evicted
+    live = {k[1] for k in store.keys() if k[0] == "data"}
+    with _GUARD:
+        for sid in [sid for sid, cs in _SOURCES.items() if cs not in live]: del _SOURCES[sid]
+        for sid in [sid for sid, lk in _SOURCE_LOCKS.items() if sid not in _SOURCES and not lk.locked()]:
+            del _SOURCE_LOCKS[sid]
+
+def upload_id(data: bytes):
+    return "upload:" + xxhash.xxh64(data).hexdigest()
+
+def dataset(source_id, load, store=SHARED, dtype=float):
+    # load() -> (df, meta) as from load_ohlcv; only called when source_id is not known yet
+    # or its data has been evicted. Two sources with the same content share one entry.
+    kind = np.dtype(dtype).str
+    with _source_lock(source_id):       # sessions opening the same file at once parse it once
+        checksum = _SOURCES.get(source_id)
+        if checksum is not None:
+            hit = store.get(("data", checksum, kind))
+            if hit is not None: return hit
+        df, meta = load()
+        _SOURCES[source_id] = meta["checksum"]
+        data = store.get_or_build(("data", meta["checksum"], kind), lambda: as_columns(df, meta, dtype))
+    _prune_sources(store)
+    return data
+
+def as_columns(df, meta, dtype=float):
+    cols = {"dates": df["Date"].to_numpy(), "open": df["Open"].to_numpy(dtype), "high": df["High"].to_numpy(dtype),
+            "low": df["Low"].to_numpy(dtype), "close": df["Close"].to_numpy(dtype),
+            "vol": df["Volume"].to_numpy(dtype) if "Volume" in df else np.full(len(df), np.nan, dtype)}
+    frame = pd.DataFrame({"Date": cols["dates"], "Open": cols["open"], "High": cols["high"], "Low": cols["low"],
+                          "Close": cols["close"], "Volume": cols["vol"]}, copy=False)
+    return {**cols, "df": frame, "meta": meta}
+
+def indicators(data, params=INDICATORS, store=SHARED):
+    # stored in the dataset's own dtype, so a compact dataset gets compact indicators
+    dtype = data["close"].dtype
+    key = ("ind", data["meta"]["checksum"], dtype.str, tuple(sorted((k, tuple(v) if isinstance(v, (list, tuple)) else v) for k, v in params.items())))
+    return store.get_or_build(key, lambda: compute_indicators(data["high"], data["low"], data["close"], params, dtype))
+
+def compute_indicators(h, l, c, params=INDICATORS, dtype=float):
+    out = {f"sma{n}": a for n, a in zip(params["sma"], sma_multi(c, params["sma"], dtype=dtype))}
+    # Keltner Channels (EMA ± mult*ATR)
+    mid = ema(c, params["kc_ema"]); rng = params["kc_mult"] * atr(h, l, c, params["kc_atr"])
+    out.update(kc_mid=mid.astype(dtype, copy=False), kc_up=(mid + rng).astype(dtype), kc_dn=(mid - rng).astype(dtype))
+    out[f"rsi{params['rsi']}"] = rsi(c, params["rsi"]).astype(dtype, copy=False)
+    return out
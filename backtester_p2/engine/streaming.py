@@ -0,0 +1,94 @@
+import math
+from collections import deque
+import numpy as np
+
+from .indicators import sma, ema, rsi, rsi_averages, atr
+
+# Incremental indicators: update() folds in one bar in O(1) time and memory and returns the
+# latest value (NaN during warm-up); batch() returns the same series as the array functions
+# in engine/indicators and leaves the object ready to continue with update().
+
+NAN = float("nan")
+
+class SMA:
+    def __init__(self, n):
+        self.n = n; self._buf = deque(maxlen=n); self._sum = 0.0; self._k = 0; self.value = NAN
+    def update(self, x):
+        x = float(x); buf = self._buf
+        if len(buf) == self.n: self._sum -= buf[0]
+        buf.append(x); self._sum += x; self._k += 1
+        if self._k >= self.n:
+            self._k = 0; self._sum = math.fsum(buf)   # re-sum every n updates to stop drift
+        self.value = self._sum / self.n if len(buf) == self.n else NAN
+        return self.value
+    def batch(self, arr):
+        arr = np.asarray(arr, float); out = sma(arr, self.n)
+        self._buf.clear(); self._buf.extend(arr[-self.n:].tolist())
+        self._sum = math.fsum(self._buf); self._k = 0
+        self.value = float(out[-1]) if len(out) else NAN
+        return out
+
+class EMA:
+    def __init__(self, n):
+        self.n = n; self.alpha = 2.0 / (n + 1); self.value = NAN
+    def update(self, x):
+        x = float(x)
+        self.value = x if self.value != self.value else (1 - self.alpha) * self.value + self.alpha * x
+        return self.value
+    def batch(self, arr):
+        out = ema(arr, self.n)
+        self.value = float(out[-1]) if len(out) else NAN
+        return out
+
+class RSI:
+    def __init__(self, n=14):
+        self.n = n; self._prev = NAN; self._k = 0; self._up = 0.0; self._dn = 0.0; self.value = NAN
+    def update(self, x):
+        x = float(x); prev = self._prev; self._prev = x
+        if prev != prev: return NAN
+        d = x - prev; up = d if d > 0 else 0.0; dn = -d if d < 0 else 0.0
+        n = self.n; self._k += 1
+        if self._k < n:
+            self._up += up; self._dn += dn; return NAN
+        if self._k == n:
+            self._up = (self._up + up) / n; self._dn = (self._dn + dn) / n
+        else:
+            a = 1.0 / n
+            self._up = (1 - a) * self._up + a * up; self._dn = (1 - a) * self._dn + a * dn
+        self.value = NAN if self._dn == 0 else 100 - 100 / (1 + self._up / self._dn)
+        return self.value
+    def batch(self, arr):
+        arr = np.asarray(arr, float); out = rsi(arr, self.n); L = len(arr)
+        self._prev = float(arr[-1]) if L else NAN; self._k = max(0, L - 1)
+        if L > self.n:
+            up, dn = rsi_averages(arr, self.n); self._up = float(up[-1]); self._dn = float(dn[-1])
+        else:   # still warming up: update() keeps running sums until n moves are seen
+            d = np.diff(arr); self._up = float(d[d > 0].sum()); self._dn = float(-d[d < 0].sum())
+        self.value = float(out[-1]) if L else NAN
+        return out
+
+class ATR:
+    def __init__(self, n=10):
+        self.n = n; self._prev_c = NAN; self.value = NAN
+    def update(self, h, l, c):
+        pc = self._prev_c if self._prev_c == self._prev_c else float(c)
+        tr = max(h - l, abs(h - pc), abs(l - pc)); self._prev_c = float(c)
+        a = 1.0 / self.n
+        self.value = float(tr) if self.value != self.value else (1 - a) * self.value + a * tr
+        return self.value
+    def batch(self, h, l, c):
+        out = atr(h, l, c, self.n)
+        if len(out): self._prev_c = float(np.asarray(c, float)[-1]); self.value = float(out[-1])
+        return out
+
+class Keltner:
+    def __init__(self, n_ema=20, n_atr=10, mult=2.0):
+        self.mid = EMA(n_ema); self.atr = ATR(n_atr); self.mult = mult; self.value = (NAN, NAN, NAN)
+    def update(self, h, l, c):
+        m = self.mid.update(c); r = self.mult * self.atr.update(h, l, c)
+        self.value = (m, m + r, m - r)
+        return self.value
+    def batch(self, h, l, c):
+        m = self.mid.batch(c); r = self.mult * self.atr.batch(h, l, c)
+        self.value = (self.mid.value, self.mid.value + self.mult * self.atr.value, self.mid.value - self.mult * self.atr.value)
+        return m, m + r, m - r
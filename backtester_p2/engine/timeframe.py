@@ -0,0 +1,131 @@
+import numpy as np, pandas as pd
+from pandas.tseries.frequencies import to_offset
+
+from .shared import SHARED
+
+# Higher-timeframe bars from the base series: "W", "ME" (months), "QE", "YE", their multiples
+# ("2W", "3ME") and fixed multiples such as "5min", "4h" or "2D". Each base bar gets a bucket
+# key (a fixed-width bin counted from the first day, or a calendar period ordinal in groups of
+# the multiple, the first group ending with the first bar's period as in pandas), runs of
+# equal keys form one bar, and OHLCV come from ufunc.reduceat over the run starts. A bar's
+# Date is that of its first base bar.
+#
+# index() maps base bars back to the last *completed* higher-timeframe bar, so
+# map_back(weekly_sma, r.index()) never shows a bar its week has not closed yet: a group
+# completes on its last base bar, and the newest group counts as still forming. append()
+# folds new base bars in, extending the open group and adding new ones, without touching
+# the rest. resampled() caches the result per (data checksum, rule, dtype) in the shared store.
+
+_PERIOD = {"ME": "M", "QE": "Q", "YE": "Y"}         # offset alias -> period alias
+_DAY = 86_400 * 10**9
+
+def _step(rule):
+    # fixed-width rules -> bin width in ns; calendar rules -> None
+    off = to_offset(rule)
+    if isinstance(off, pd.offsets.Day): return off.n * _DAY
+    if isinstance(off, pd.offsets.Tick): return pd.Timedelta(off).value
+    return None
+
+def _ns(dates):
+    return np.asarray(dates, "datetime64[ns]").view(np.int64)
+
+def _ordinals(v, rule):
+    # calendar rules -> (period ordinal of each date, multiple)
+    off = to_offset(rule); head, _, anchor = off.base.freqstr.partition("-")
+    freq = _PERIOD.get(head, head) + ("-" + anchor if anchor else "")
+    try:
+        return pd.DatetimeIndex(v.view("datetime64[ns]")).to_period(freq).asi8, off.n
+    except ValueError:
+        raise ValueError(f"unsupported resample rule {rule!r}") from None
+
+def bucket_keys(dates, rule, origin=0):
+    # origin: first bin start in ns (fixed-width rules) or first period ordinal (calendar rules)
+    v = _ns(dates); step = _step(rule)
+    if step is not None: return (v - origin) // step
+    p, n = _ordinals(v, rule)
+    return (p - origin + n - 1) // n
+
+def map_back(values, idx):
+    # values per higher-timeframe bar -> per base bar via idx from Resampled.index()
+    values = np.asarray(values, float); out = np.full(len(idx), np.nan)
+    ok = idx >= 0; out[ok] = values[idx[ok]]
+    return out
+
+COLS = (("date", np.int64), ("key", np.int64), ("first", np.int64), ("open", np.float64),
+        ("high", np.float64), ("low", np.float64), ("close", np.float64), ("vol", np.float64))
+
+class Resampled:
+    def __init__(self, rule, capacity=256):
+        self.rule = rule; self.step = _step(rule); self.origin = None
+        self.n = 0; self.n_base = 0
+        self._c = {k: np.empty(capacity, dt) for k, dt in COLS}
+
+    def _grow(self, need):
+        cap = len(self._c["key"])
+        if need <= cap: return
+        cap = max(need, 2 * cap)
+        for k, a in self._c.items():
+            b = np.empty(cap, a.dtype); b[:self.n] = a[:self.n]; self._c[k] = b
+
+    def append(self, dates, o, h, l, c, v=None):
+        m = len(dates)
+        if not m: return self
+        d = _ns(dates)
+        if self.origin is None:             # bins start on the first day / period
+            self.origin = int(d[0] - d[0] % _DAY) if self.step else int(_ordinals(d[:1], self.rule)[0][0])
+        keys = bucket_keys(d, self.rule, self.origin)
+        o, h, l, c = (np.asarray(x, float) for x in (o, h, l, c))
+        v = np.full(m, np.nan) if v is None else np.asarray(v, float)
+        if (np.diff(keys) < 0).any() or (self.n and keys[0] < self._c["key"][self.n - 1]):
+            raise ValueError("base bars must be appended in Date order")
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        C = self._c; n = self.n
+        if n and keys[0] == C["key"][n - 1]:
+            # the first run continues the open bar
+            e = starts[1] if len(starts) > 1 else m
+            C["high"][n - 1] = max(C["high"][n - 1], h[:e].max()); C["low"][n - 1] = min(C["low"][n - 1], l[:e].min())
+            C["close"][n - 1] = c[e - 1]; C["vol"][n - 1] += v[:e].sum()
+            starts = starts[1:]
+        k = len(starts)
+        if k:
+            self._grow(n + k)
+            s0 = starts[0]; rel = starts - s0; ends = np.r_[starts[1:], m]
+            new = {"date": d[starts], "key": keys[starts], "first": self.n_base + starts, "open": o[starts],
+                   "high": np.maximum.reduceat(h[s0:], rel), "low": np.minimum.reduceat(l[s0:], rel),
+                   "close": c[ends - 1], "vol": np.add.reduceat(v[s0:], rel)}
+            for name, a in new.items(): C[name][n:n + k] = a
+            self.n = n + k
+        self.n_base += m
+        return self
+
+    # --- views ---
+    def bars(self):
+        C = self._c; n = self.n
+        out = {k: C[k][:n] for k in ("open", "high", "low", "close", "vol", "first")}
+        out["dates"] = C["date"][:n].view("datetime64[ns]")
+        return out
+
+    def group(self, start=0):
+        # higher-timeframe bar each base bar start.. belongs to (may still be forming)
+        f = self._c["first"][:self.n]
+        if start >= self.n_base: return np.empty(0, np.int64)
+        g0 = int(np.searchsorted(f, start, side="right")) - 1
+        out = np.repeat(np.arange(g0, self.n), np.diff(np.r_[f[g0:], self.n_base]))
+        return out[start - f[g0]:]
+
+    def index(self, start=0):
+        # last completed higher-timeframe bar as of each base bar start.. (-1: none yet)
+        g = self.group(start); out = g - 1
+        last = self._c["first"][1:self.n] - 1 - start      # where each completed bar closes
+        last = last[last >= 0]; out[last] = g[last]
+        return out
+
+def resample(dates, o, h, l, c, v=None, rule="W"):
+    return Resampled(rule).append(dates, o, h, l, c, v)
+
+def resampled(data, rule, store=SHARED):
+    # data: a shared dataset (engine.shared.dataset); bars() plus the aligned "index"
+    def build():
+        r = resample(data["dates"], data["open"], data["high"], data["low"], data["close"], data["vol"], rule)
+        return {**{k: a.copy() for k, a in r.bars().items()}, "index": r.index(), "rule": rule}
+    return store.get_or_build(("tf", data["meta"]["checksum"], data["close"].dtype.str, rule), build)
@@ -0,0 +1,97 @@
+import json, os, shutil, tempfile
+import numpy as np, pandas as pd, xxhash
+
+# Content-addressed column cache for parsed OHLCV data.
+#   <root>/sources/<source key>.json         path/size/mtime of a CSV -> data entry
+#   <root>/data/<checksum>-<schema>/<col>.npy sorted, parsed columns + meta.json
+# A hit memory-maps the .npy files and wraps them in a DataFrame without copying. The data
+# checksum covers only the OHLCV columns, so the entry is also keyed on the frame's column
+# names and dtypes: files that differ only in their extra columns get entries of their own.
+# Frames with a column NumPy cannot map (strings, tz-aware dates, ...) are not cached.
+
+_MAPPABLE = "biufcmM"                              # bool, ints, floats, complex, timedelta, datetime
+
+DEFAULT_CACHE_DIR = os.environ.get("BACKTESTER_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "backtester_p2"))
+DEFAULT_MAX_BYTES = int(os.environ.get("BACKTESTER_CACHE_MAX_BYTES", 8 * 1024**3))
+
+def source_key(path):
+    st = os.stat(path)
+    return xxhash.xxh64(f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}".encode()).hexdigest()
+
+def _data_dir(root, entry): return os.path.join(root, "data", entry)
+
+def _entry(df, meta):
+    schema = json.dumps([(str(c), df[c].dtype.str) for c in df.columns])
+    return f"{meta['checksum']}-{xxhash.xxh64(schema.encode()).hexdigest()}"
+
+def lookup(root, path):
+    try:
+        with open(os.path.join(root, "sources", source_key(path) + ".json")) as f:
+            d = _data_dir(root, json.load(f)["entry"])
+        with open(os.path.join(d, "meta.json")) as f:
+            info = json.load(f)
+        cols = {c: np.load(os.path.join(d, c + ".npy"), mmap_mode="r").view(np.ndarray) for c in info["columns"]}
+    except (OSError, ValueError, KeyError):
+        return None
+    os.utime(os.path.join(d, "meta.json"))        # LRU stamp
+    return pd.DataFrame(cols, copy=False), info["meta"]
+
+def store(root, path, df, meta, max_bytes=DEFAULT_MAX_BYTES):
+    try:
+        return _store(root, path, df, meta, max_bytes)
+    except OSError:
+        return False                               # a cache that can't be written is just a miss
+
+def _store(root, path, df, meta, max_bytes):
+    if not all(isinstance(t, np.dtype) and t.kind in _MAPPABLE for t in df.dtypes):
+        return False                               # e.g. str or tz-aware columns: not mappable
+    os.makedirs(os.path.join(root, "sources"), exist_ok=True)
+    os.makedirs(os.path.join(root, "data"), exist_ok=True)
+    entry = _entry(df, meta); d = _data_dir(root, entry)
+    if not os.path.isdir(d):
+        tmp = tempfile.mkdtemp(dir=os.path.join(root, "data"), prefix=".tmp_")
+        try:
+            for c in df.columns:
+                np.save(os.path.join(tmp, c + ".npy"), np.ascontiguousarray(df[c].to_numpy()))
+            with open(os.path.join(tmp, "meta.json"), "w") as f:
+                json.dump({"columns": list(df.columns), "meta": meta}, f)
+            os.replace(tmp, d)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not os.path.isdir(d): return False  # another process may have won the rename
+    st = os.stat(path)
+    src = os.path.join(root, "sources", source_key(path) + ".json")
+    with open(src + ".tmp", "w") as f:
+        json.dump({"entry": entry, "checksum": meta["checksum"], "path": os.path.abspath(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}, f)
+    os.replace(src + ".tmp", src)
+    evict(root, max_bytes, keep=entry)
+    return True
+
+def _dir_bytes(d):
+    return sum(e.stat().st_size for e in os.scandir(d) if e.is_file())
+
+def evict(root, max_bytes, keep=None):
+    base = os.path.join(root, "data")
+    entries = []
+    for e in os.scandir(base):
+        if not e.is_dir() or e.name.startswith("."): continue
+        try: entries.append((os.stat(os.path.join(e.path, "meta.json")).st_mtime, _dir_bytes(e.path), e.name))
+        except OSError: continue
+    total = sum(b for _, b, _ in entries)
+    for _, b, name in sorted(entries):
+        if total <= max_bytes: break
+        if name == keep: continue
+        shutil.rmtree(os.path.join(base, name), ignore_errors=True); total -= b
+    # drop source entries whose data has gone
+    for e in os.scandir(os.path.join(root, "sources")):
+        if not e.name.endswith(".json"): continue  # a source being written
+        try:
+            with open(e.path) as f:
+                gone = not os.path.isdir(_data_dir(root, json.load(f)["entry"]))
+        except (KeyError, ValueError):
+            gone = True                            # unreadable, or written before entries were schema-keyed
+        except OSError:
+            continue
+        if gone:
+            try: os.remove(e.path)
+            except OSError: pass
@@ -3,7 +3,11 @@ from datetime import datetime
 
 REQUIRED_COLS = ["Date","Open","High","Low","Close","Volume"]
 
-def load_ohlcv(path: str):
+def load_ohlcv(path: str, cache_dir=None, max_cache_bytes=None):
+    if cache_dir:
+        from . import cache
+        hit = cache.lookup(cache_dir, path)
+        if hit is not None: return hit
     df = pd.read_csv(path)
     for col in REQUIRED_COLS:
         if col not in df.columns:
@@ -14,4 +18,6 @@ def load_ohlcv(path: str):
     for col in REQUIRED_COLS:
         h.update(pd.util.hash_pandas_object(df[col], index=False).values.tobytes())
     meta = {"rows": len(df), "checksum": h.hexdigest(), "start": str(df.iloc[0]["Date"]), "end": str(df.iloc[-1]["Date"])}
+    if cache_dir:
+        cache.store(cache_dir, path, df, meta, max_cache_bytes or cache.DEFAULT_MAX_BYTES)
     return df, meta
@@ -0,0 +1,86 @@
+import numpy as np, pandas as pd, xxhash
+from pandas.tseries.frequencies import to_offset
+
+from .csv_loader import REQUIRED_COLS
+
+# Chunked CSV ingest: reads `chunksize` rows at a time, optionally resamples to a pandas
+# offset alias (e.g. the Manifest timeframe "D", or "h", "5min") while reading, and returns
+# one contiguous array per column. Peak memory is one chunk plus the output columns.
+#
+# The input must already be in Date order (it cannot be sorted without holding it all).
+# Its checksum is xxh64 over the per-column xxh64 digests of the same row hashes
+# load_ohlcv uses, so it is stable across chunk sizes but is not the load_ohlcv checksum.
+
+class UnsortedError(ValueError):
+    pass
+
+AGG = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+def _fixed(rule):
+    # fixed-width rules (minutes, hours, n days) become a Timedelta so every chunk can share
+    # one bin origin; calendar rules (W, ME, ...) are anchored by pandas already
+    off = to_offset(rule)
+    if isinstance(off, pd.offsets.Day): return pd.Timedelta(days=off.n)
+    if isinstance(off, pd.offsets.Tick): return pd.Timedelta(off)
+    return None
+
+def _resample(chunk, rule, origin="start_day"):
+    fixed = _fixed(rule)
+    g = chunk.set_index("Date").resample(fixed, origin=origin) if fixed is not None else chunk.set_index("Date").resample(rule)
+    bars = pd.DataFrame({c: getattr(g[c], f)() for c, f in AGG.items()})
+    return bars.dropna(subset=["Open"])            # resample emits empty bins for gaps
+
+def _merge(a, b):
+    # a, b: one-row frames for the same bin, a earlier than b
+    return pd.DataFrame({"Open": a["Open"].values, "High": np.maximum(a["High"].values, b["High"].values),
+                         "Low": np.minimum(a["Low"].values, b["Low"].values), "Close": b["Close"].values,
+                         "Volume": a["Volume"].values + b["Volume"].values}, index=a.index)
+
+def stream_ohlcv(src, chunksize=500_000, timeframe=None):
+    hashers = {c: xxhash.xxh64() for c in REQUIRED_COLS}
+    parts = {c: [] for c in REQUIRED_COLS}
+    carry = None; last = None; n_src = 0; origin = None
+
+    def emit(bars):
+        parts["Date"].append(bars.index.to_numpy())
+        for c in REQUIRED_COLS[1:]: parts[c].append(bars[c].to_numpy())
+
+    for chunk in pd.read_csv(src, chunksize=chunksize):
+        for col in REQUIRED_COLS:
+            if col not in chunk.columns:
+                raise ValueError(f"CSV missing {col}")
+        if not len(chunk): continue
+        chunk = chunk[REQUIRED_COLS].copy()
+        chunk["Date"] = pd.to_datetime(chunk["Date"])
+        d = chunk["Date"]
+        if not d.is_monotonic_increasing or (last is not None and d.iloc[0] < last):
+            raise UnsortedError("CSV is not sorted by Date; use load_ohlcv for unsorted files")
+        if origin is None: origin = d.iloc[0].normalize()   # pin fixed-size bins to the file's first day, not each chunk's
+        last = d.iloc[-1]; n_src += len(chunk)
+        for col in REQUIRED_COLS:
+            hashers[col].update(pd.util.hash_pandas_object(chunk[col], index=False).values.tobytes())
+
+        if timeframe is None:
+            parts["Date"].append(d.to_numpy())
+            for c in REQUIRED_COLS[1:]: parts[c].append(chunk[c].to_numpy())
+            continue
+        bars = _resample(chunk, timeframe, origin)
+        if carry is not None:
+            if bars.index[0] == carry.index[0]:
+                bars = pd.concat([_merge(carry, bars.iloc[:1]), bars.iloc[1:]])
+            else:
+                emit(carry)
+        emit(bars.iloc[:-1]); carry = bars.iloc[-1:]    # the last bin may continue in the next chunk
+    if carry is not None: emit(carry)
+
+    if not n_src: raise ValueError("CSV has no rows")
+    cols = {c: np.concatenate(parts[c]) for c in REQUIRED_COLS}
+    h = xxhash.xxh64()
+    for c in REQUIRED_COLS: h.update(hashers[c].digest())
+    meta = {"rows": len(cols["Date"]), "checksum": h.hexdigest(),
+            "start": str(pd.Timestamp(cols["Date"][0])), "end": str(pd.Timestamp(cols["Date"][-1])),
+            "source_rows": n_src, "timeframe": timeframe}
+    return cols, meta
+
+def frame_from_columns(cols):
+    return pd.DataFrame(cols, copy=False)
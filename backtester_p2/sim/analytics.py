@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+
+# Performance statistics over equity curves. Every function takes one run as a (bars,) array
+# or many runs as a (runs, bars) matrix and reduces along the last axis, so a whole sweep is
+# scored in a few array passes. Inputs are the per-bar columns Broker/Recorder, run_vectorized
+# and PortfolioBroker.run produce: equity, position, close and cumulative realized P&L.
+# `periods` is bars per year (see periods_per_year); the default assumes daily bars.
+
+PERIODS = 252
+
+def _arr(x): return np.asarray(x, dtype=float)
+
+def _mean(x):
+    n = x.shape[-1]
+    with np.errstate(all="ignore"): return x.sum(-1) / n
+
+def _std(x, ddof=1):
+    n = x.shape[-1]
+    if n <= ddof: return np.full(x.shape[:-1], np.nan)
+    with np.errstate(all="ignore"):
+        return np.sqrt(((x - _mean(x)[..., None]) ** 2).sum(-1) / (n - ddof))
+
+def periods_per_year(dates):
+    d = np.asarray(dates, dtype="datetime64[ns]")
+    if len(d) < 2: return float(PERIODS)
+    years = (d[-1] - d[0]) / np.timedelta64(1, "D") / 365.25
+    return (len(d) - 1) / years if years > 0 else float(PERIODS)
+
+def returns(equity):
+    eq = _arr(equity)
+    with np.errstate(all="ignore"): return eq[..., 1:] / eq[..., :-1] - 1.0
+
+# --- return-based ---
+def sharpe(equity, periods=PERIODS, rf=0.0):
+    r = returns(equity) - rf / periods
+    with np.errstate(all="ignore"): return _mean(r) / _std(r) * np.sqrt(periods)
+
+def sortino(equity, periods=PERIODS, rf=0.0):
+    r = returns(equity) - rf / periods
+    down = np.sqrt(_mean(np.minimum(r, 0.0) ** 2))
+    with np.errstate(all="ignore"): return _mean(r) / down * np.sqrt(periods)
+
+def cagr(equity, periods=PERIODS):
+    eq = _arr(equity); years = (eq.shape[-1] - 1) / periods
+    if years <= 0: return np.full(eq.shape[:-1], np.nan)
+    with np.errstate(all="ignore"):
+        g = eq[..., -1] / eq[..., 0]
+        return np.where(g > 0, np.power(np.maximum(g, 0.0), 1.0 / years) - 1.0, np.nan)
+
+def rolling_vol(equity, n=20, periods=PERIODS):
+    # annualized std of the last n returns, aligned to bars (NaN for the first n bars)
+    r = returns(equity); shape = r.shape[:-1] + (r.shape[-1] + 1,)
+    flat = r.reshape(-1, r.shape[-1])
+    out = np.full((flat.shape[0], flat.shape[1] + 1), np.nan)
+    out[:, 1:] = pd.DataFrame(flat.T).rolling(n).std().to_numpy().T * np.sqrt(periods)
+    return out.reshape(shape)
+
+# --- drawdowns ---
+def drawdowns(equity):
+    eq = _arr(equity)
+    peak = np.maximum.accumulate(eq, axis=-1)
+    return peak, peak - eq
+
+def max_drawdown(equity):
+    # largest peak-to-trough fall: (absolute, fraction of the peak)
+    peak, dd = drawdowns(equity)
+    with np.errstate(all="ignore"): pct = np.where(peak > 0, dd / peak, np.nan)
+    return dd.max(-1, initial=0.0), np.nanmax(pct, -1, initial=0.0)
+
+def drawdown_duration(equity):
+    # longest stretch of bars spent below the previous peak (an unrecovered one counts too)
+    eq = _arr(equity); peak, _ = drawdowns(eq)
+    idx = np.arange(eq.shape[-1])
+    last_peak = np.maximum.accumulate(np.where(eq >= peak, idx, 0), axis=-1)
+    return (idx - last_peak).max(-1, initial=0)
+
+# --- position-based ---
+def exposure(pos):
+    return _mean((_arr(pos) != 0).astype(float))
+
+def turnover(pos, close, equity):
+    # traded notional over the run divided by average equity
+    pos = _arr(pos); dq = np.abs(np.diff(pos, axis=-1, prepend=0.0))
+    with np.errstate(all="ignore"): return (dq * _arr(close)).sum(-1) / _mean(_arr(equity))
+
+def trade_stats(pos, pnl_realized):
+    # A trade is a bar on which the position shrinks or flips; its result is the change in
+    # realized P&L on that bar (fees excluded, as in BrokerState.pnl_realized).
+    pos = _arr(pos); prev = np.zeros_like(pos); prev[..., 1:] = pos[..., :-1]
+    closing = (prev != 0) & ((np.sign(pos) != np.sign(prev)) | (np.abs(pos) < np.abs(prev)))
+    pnl = np.diff(_arr(pnl_realized), axis=-1, prepend=0.0)
+    n = closing.sum(-1); won = (closing & (pnl > 0)).sum(-1)
+    total = np.where(closing, pnl, 0.0).sum(-1)
+    with np.errstate(all="ignore"):
+        return {"trades": n, "win_rate": np.where(n > 0, won / n, np.nan),
+                "expectancy": np.where(n > 0, total / n, np.nan)}
+
+# --- everything at once ---
+BLOCK = 1 << 15      # elements per row block; keeps summary()'s temporaries in cache
+
+def summary(equity, pos=None, close=None, pnl_realized=None, periods=PERIODS):
+    eq = _arr(equity)
+    rows = max(1, BLOCK // max(1, eq.shape[-1]))
+    if eq.ndim == 2 and len(eq) > rows:
+        # close may be shared (bars,) or per run (runs, bars)
+        pick = lambda a, s: a if a is None or np.ndim(a) < 2 else np.asarray(a)[s]
+        parts = [summary(eq[k:k + rows], pick(pos, slice(k, k + rows)), pick(close, slice(k, k + rows)),
+                         pick(pnl_realized, slice(k, k + rows)), periods) for k in range(0, len(eq), rows)]
+        return {key: np.concatenate([p[key] for p in parts]) for key in parts[0]}
+    dd, dd_pct = max_drawdown(eq)
+    out = {"sharpe": sharpe(eq, periods), "sortino": sortino(eq, periods), "cagr": cagr(eq, periods),
+           "max_drawdown": dd, "max_drawdown_pct": dd_pct, "max_drawdown_bars": drawdown_duration(eq),
+           "volatility": _std(returns(eq)) * np.sqrt(periods)}
+    if pos is not None:
+        out["exposure"] = exposure(pos)
+        if close is not None: out["turnover"] = turnover(pos, close, eq)
+        if pnl_realized is not None: out.update(trade_stats(pos, pnl_realized))
+    if eq.ndim == 1: out = {k: v.item() for k, v in ((k, np.asarray(v)) for k, v in out.items())}
+    return out
+
+def rank_runs(stats, key="sharpe", descending=True):
+    # row order of a batched summary() by one statistic, NaN last
+    v = np.asarray(stats[key], float)
+    v = np.where(np.isnan(v), -np.inf if descending else np.inf, v)
+    return np.argsort(-v if descending else v, kind="stable")
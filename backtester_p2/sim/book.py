@@ -0,0 +1,65 @@
+import heapq
+from typing import Dict, List
+from .orders import Order, OrderType, Side
+
+# Resting-order index. Orders triggered by the bar low (buy limits, sell stops) sit in a
+# max-heap on price; orders triggered by the bar high (sell limits, buy stops) in a min-heap.
+# A bar only pops the entries its range reaches. Every order gets a placement sequence
+# number so fills within a bar keep the order they were placed in.
+
+class OrderBook:
+    def __init__(self):
+        self._seq = 0
+        self.open: Dict[int, Order] = {}     # seq -> order, in placement order
+        self._market: List[tuple] = []
+        self._below: List[tuple] = []        # (-price, seq, order)
+        self._above: List[tuple] = []        # (price, seq, order)
+
+    def __len__(self): return len(self.open)
+
+    def add(self, o: Order):
+        self._seq += 1; s = self._seq
+        self.open[s] = o
+        if o.type == OrderType.MARKET:
+            self._market.append((s, o))
+        elif o.type == OrderType.LIMIT:
+            if o.side == Side.BUY: heapq.heappush(self._below, (-o.limit_price, s, o))
+            else: heapq.heappush(self._above, (o.limit_price, s, o))
+        elif o.type == OrderType.STOP:
+            if o.side == Side.SELL: heapq.heappush(self._below, (-o.stop_price, s, o))
+            else: heapq.heappush(self._above, (o.stop_price, s, o))
+
+    def clear(self):
+        self.open.clear(); self._market.clear(); self._below.clear(); self._above.clear()
+
+    def orders(self) -> List[Order]:
+        return list(self.open.values())
+
+    def reset(self, orders: List[Order]):
+        self.clear()
+        for o in orders: self.add(o)
+
+    def can_trigger(self, h: float, l: float) -> bool:
+        return bool(self._market or (self._below and -self._below[0][0] >= l) or (self._above and self._above[0][0] <= h))
+
+    # Trigger band of the resting orders: a bar fills something if its low is at or below the
+    # first value or its high at or above the second (market orders aside).
+    def reach(self):
+        return (-self._below[0][0] if self._below else float("-inf"),
+                self._above[0][0] if self._above else float("inf"))
+
+    # Remove and return, in placement order, the open orders this bar touches: all MARKET
+    # orders plus every resting order whose price lies inside [l, h].
+    def pop_triggered(self, h: float, l: float) -> List[Order]:
+        hit = self._market; self._market = []
+        below, above, open_ = self._below, self._above, self.open
+        while below and -below[0][0] >= l:
+            _, s, o = heapq.heappop(below); hit.append((s, o))
+        while above and above[0][0] <= h:
+            _, s, o = heapq.heappop(above); hit.append((s, o))
+        if len(hit) > 1: hit.sort(key=lambda e: e[0])
+        out = []
+        for s, o in hit:
+            if open_.pop(s, None) is not None and o.status == "OPEN":
+                out.append(o)
+        return out
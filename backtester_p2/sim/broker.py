@@ -1,7 +1,11 @@
-from dataclasses import dataclass, field
+import pickle, time
+from collections import deque
+from dataclasses import dataclass, field, replace
 from typing import List
 from .orders import Order, OrderType, Side
 from .config import SimConfig
+from .book import OrderBook
+from backtester_p2.engine.instrument import PROF
 
 @dataclass
 class Position:
@@ -17,21 +21,155 @@ class BrokerState:
     max_equity: float = 0.0
     drawdown: float = 0.0
 
+@dataclass
+class Checkpoint:
+    bar: int
+    state: BrokerState
+    orders: List[Order]      # the open Order objects themselves; restore re-opens them
+
+def _floats(a, lo, hi):
+    a = a[lo:hi]
+    return a.tolist() if hasattr(a, "tolist") else a
+
+def _copy_state(s: BrokerState) -> BrokerState:
+    return replace(s, pos=replace(s.pos))
+
 class Broker:
-    def __init__(self, cfg: SimConfig):
+    # checkpoint_every: snapshot after every K-th processed bar (0 disables periodic snapshots)
+    # max_checkpoints: ring capacity; the initial state is kept outside the ring
+    # recorder: optional sim.recorder.Recorder that keeps the fill ledger and equity curve
+    # intrabar: optional sim.intrabar.SubBars; bars whose range reaches a resting order are
+    #   resolved on their sub-bars instead of their own OHLC
+    def __init__(self, cfg: SimConfig, checkpoint_every: int = 64, max_checkpoints: int = 256, recorder=None, intrabar=None):
         self.cfg = cfg
-        self.orders: List[Order] = []
+        self.book = OrderBook()
         self.state = BrokerState(cash=cfg.cash)
+        self.bar = -1                      # last processed bar index
+        self.checkpoint_every = checkpoint_every
+        self._ckpts = deque(maxlen=max_checkpoints)
+        self._dirty = False                # order events since the last checkpoint
+        self._origin = self._snapshot()
+        self.last_replay = {"bars": 0, "seconds": 0.0}
+        self.intrabar = intrabar; self.drilled_bars = 0
+        self.recorder = recorder; self._bar_hook = None
+        if recorder is not None:
+            recorder.attach(self)
+            if recorder.close is None: self._bar_hook = recorder.on_bar
+        self.instrument(PROF.enabled)
+
+    @property
+    def orders(self) -> List[Order]:
+        return self.book.orders()
 
     def place(self, order: Order):
-        self.orders.append(order)
         order.status = "OPEN"
+        self.book.add(order)
+        self._dirty = True
         return order
 
     def cancel_all(self):
-        for o in self.orders:
-            if o.status == "OPEN":
-                o.status = "CANCELED"
+        for o in self.book.open.values():
+            o.status = "CANCELED"
+        self.book.clear()
+        self._dirty = True
+
+    # --- checkpoints ---
+    # Order events are snapshotted once per bar, when the broker moves on, so placing a
+    # ladder of orders costs O(1) per order rather than one snapshot each.
+    def _snapshot(self) -> Checkpoint:
+        return Checkpoint(self.bar, _copy_state(self.state), self.book.orders())
+
+    def _checkpoint(self):
+        self._dirty = False
+        ck = self._snapshot()
+        if self._ckpts and self._ckpts[-1].bar == self.bar:
+            self._ckpts[-1] = ck         # later event on the same bar supersedes
+        else:
+            if len(self._ckpts) == self._ckpts.maxlen:
+                self._origin = None      # history before the ring can no longer be rebuilt
+            self._ckpts.append(ck)
+
+    def _restore(self, ck: Checkpoint):
+        self.bar = ck.bar
+        self.state = _copy_state(ck.state)
+        for o in ck.orders:
+            o.status = "OPEN"; o.filled_qty = 0.0; o.avg_price = 0.0; o.fill_index = -1
+        self.book.reset(ck.orders)
+        if self.recorder is not None: self.recorder.truncate(ck.bar)
+
+    # Bring the broker to "bar i processed". Going back restores the newest checkpoint at or
+    # before i, going forward continues from the current state; every bar in between is replayed.
+    # Returns the bar reached, which is later than i when i is older than the ring can restore.
+    def seek(self, i: int, o, h, l, c) -> int:
+        t0 = time.perf_counter()
+        if self._dirty: self._checkpoint()
+        if i < self.bar:
+            if self._origin is None and (not self._ckpts or self._ckpts[0].bar > i):
+                i = self._ckpts[0].bar if self._ckpts else self.bar
+            while len(self._ckpts) > 1 and self._ckpts[-1].bar > i:
+                self._ckpts.pop()
+            if self._ckpts and self._ckpts[-1].bar <= i:
+                self._restore(self._ckpts[-1])
+            elif self._origin is not None:
+                self._ckpts.clear(); self._restore(self._origin)
+        start = self.bar + 1
+        # Python floats for the span: faster than indexing arrays, and float32 columns
+        # (compact mode) must not turn the account math into float32 scalars
+        O, H, L, C = (_floats(a, start, i + 1) for a in (o, h, l, c))
+        for k in range(start, i + 1):
+            j = k - start
+            self.process_bar(k, O[j], H[j], L[j], C[j])
+        self.last_replay = {"bars": max(0, i + 1 - start), "seconds": time.perf_counter() - t0}
+        return self.bar
+
+    def checkpoint_stats(self) -> dict:
+        return {"count": len(self._ckpts), "capacity": self._ckpts.maxlen, "every": self.checkpoint_every,
+                "bytes": sum(len(pickle.dumps(ck)) for ck in self._ckpts),
+                "last_replay_bars": self.last_replay["bars"], "last_replay_seconds": self.last_replay["seconds"]}
+
+    def _fill_all(self, orders, i: int, ref: float, o: float):
+        # ref: MARKET fill price; o: the open a gapping STOP fills at
+        for od in orders:
+            if od.type == OrderType.MARKET:
+                self._fill(od, ref, i)
+            elif od.type == OrderType.LIMIT:
+                self._fill(od, od.limit_price, i)
+            elif od.side == Side.BUY:
+                self._fill(od, max(od.stop_price, o), i)
+            else:
+                self._fill(od, min(od.stop_price, o), i)
+
+    # Walk bar i's sub-bars (sim/intrabar.py), jumping straight to the next one whose range
+    # reaches the book, so LIMIT/STOP orders fill in the order the path hits them. MARKET
+    # orders go on the first sub-bar at the usual bar-level price.
+    def _drill(self, i: int, ref: float):
+        sb = self.intrabar; s, e = sb.bounds(i); book = self.book
+        SO, SH, SL = sb.o, sb.h, sb.l
+        self.drilled_bars += 1
+        j = s
+        while j < e and book.open:
+            if not book._market:
+                lo, hi = book.reach()
+                hit = (SL[j:e] <= lo) | (SH[j:e] >= hi)
+                k = int(hit.argmax())
+                if not hit[k]: break
+                j += k
+            self._fill_all(book.pop_triggered(SH[j], SL[j]), i, ref, SO[j])
+            j += 1
+
+    # --- profiling ---
+    # Swaps in a timed process_bar on this instance only, so the unprofiled path stays as is.
+    # prof: the Instrument to report to (default: the process-wide PROF)
+    def instrument(self, on: bool = True, prof=None):
+        self._prof = prof or PROF
+        if on: self.process_bar = self._process_bar_profiled
+        else: self.__dict__.pop("process_bar", None)
+
+    def _process_bar_profiled(self, i: int, o: float, h: float, l: float, c: float):
+        n = len(self.book.open); t0 = time.perf_counter(); prof = self._prof
+        type(self).process_bar(self, i, o, h, l, c)
+        prof.add("broker.process_bar", time.perf_counter() - t0)
+        prof.count("broker.orders_resting", n); prof.count("broker.fills", n - len(self.book.open))
 
     # --- helpers ---
     def _apply_slip(self, price: float, side: Side) -> float:
@@ -45,6 +183,7 @@ class Broker:
         price = self._apply_slip(price, o.side)
         fee = self._apply_fee(price * o.qty)
         notional = price * o.qty
+        pnl0 = self.state.pnl_realized
 
         if o.side == Side.BUY:
             # increase/flip to long
@@ -83,34 +222,43 @@ class Broker:
         o.status = "FILLED"
         o.filled_qty = o.qty
         o.avg_price = price
+        o.fill_index = i
+        if self.recorder is not None:
+            self.recorder.on_fill(i, o, price, fee, self.state.pnl_realized - pnl0, self.state)
 
     # --- main bar processor ---
     def process_bar(self, i: int, o: float, h: float, l: float, c: float):
-        remaining: List[Order] = []
-        for od in self.orders:
-            if od.status != "OPEN":
-                continue
-            if od.type == OrderType.MARKET:
-                ref = o if self.cfg.policy == "next_open" else c
-                self._fill(od, ref, i)
-            elif od.type == OrderType.LIMIT:
-                if od.side == Side.BUY and l <= od.limit_price:
-                    self._fill(od, od.limit_price, i)
-                elif od.side == Side.SELL and h >= od.limit_price:
-                    self._fill(od, od.limit_price, i)
-                else:
-                    remaining.append(od)
-            elif od.type == OrderType.STOP:
-                if od.side == Side.BUY and h >= od.stop_price:
-                    self._fill(od, max(od.stop_price, o), i)
-                elif od.side == Side.SELL and l <= od.stop_price:
-                    self._fill(od, min(od.stop_price, o), i)
-                else:
-                    remaining.append(od)
-
-        self.orders = remaining
+        if self._dirty: self._checkpoint()
+        if self.book.open:
+            ref = o if self.cfg.policy == "next_open" else c
+            if self.intrabar is not None and self.book.can_trigger(h, l) and self.intrabar.has(i):
+                self._drill(i, ref)
+            else:
+                self._fill_all(self.book.pop_triggered(h, l), i, ref, o)
 
         # Mark-to-market on close
         self.state.equity = self.state.cash + self.state.pos.qty * c
         self.state.max_equity = max(self.state.max_equity, self.state.equity)
         self.state.drawdown = self.state.max_equity - self.state.equity
+        if self._bar_hook is not None: self._bar_hook(c)
+
+        self.bar = i
+        if self.checkpoint_every and i % self.checkpoint_every == 0:
+            self._checkpoint()
+
+    # Settle bars lo..hi-1 at once when no orders are open: only the mark moves, so this ends
+    # in the same state as process_bar on each of them. Not for periodic checkpointing
+    # (checkpoint_every > 0), which needs every bar; c is the full close list/array. Orders
+    # placed on the skipped bars are snapshotted at hi-1, where process_bar(hi) would take it.
+    def mark_range(self, lo: int, hi: int, c):
+        if hi <= lo: return
+        s = self.state; q = s.pos.qty
+        seg = c[lo:hi]
+        top = s.cash + q * (max(seg) if q > 0 else min(seg)) if q else s.cash
+        s.equity = s.cash + q * c[hi - 1]
+        s.max_equity = max(s.max_equity, top, s.equity)
+        s.drawdown = s.max_equity - s.equity
+        if self._bar_hook is not None:
+            for x in seg: self._bar_hook(x)
+        self.bar = hi - 1
+        if self._dirty: self._checkpoint()
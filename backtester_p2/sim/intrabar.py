@@ -0,0 +1,41 @@
+from dataclasses import dataclass
+import numpy as np
+
+# Lower-timeframe bars for resolving fills inside a bar. A bar's own OHLC cannot tell whether
+# its high or its low came first, so a stop and a limit both inside its range fill in
+# placement order. Given sub-bars (e.g. 1-minute under daily), Broker walks the sub-bars of
+# just the bars whose range reaches a resting order and fills in path order.
+#
+# Parent bar i covers [date[i], date[i+1]); the last bar is given the median bar spacing.
+# start[i]:start[i+1] are its sub-bars, found once with searchsorted over the sorted dates.
+
+@dataclass
+class SubBars:
+    o: np.ndarray
+    h: np.ndarray
+    l: np.ndarray
+    c: np.ndarray
+    start: np.ndarray         # (n_parent + 1,) sub-bar bounds per parent bar
+
+    def bounds(self, i: int):
+        return int(self.start[i]), int(self.start[i + 1])
+
+    def has(self, i: int) -> bool:
+        return self.start[i + 1] > self.start[i]
+
+    def counts(self):
+        return np.diff(self.start)
+
+def _ns(d):
+    return np.asarray(d, "datetime64[ns]").view(np.int64)
+
+def align(parent_dates, sub_dates, o, h, l, c):
+    p, s = _ns(parent_dates), _ns(sub_dates)
+    if len(s) > 1 and (np.diff(s) < 0).any(): raise ValueError("sub-bar dates must be sorted")
+    step = int(np.median(np.diff(p))) if len(p) > 1 else np.iinfo(np.int64).max - p[0]
+    start = np.searchsorted(s, np.r_[p, p[-1] + step], side="left")
+    return SubBars(*(np.ascontiguousarray(x, float) for x in (o, h, l, c)), start)
+
+def from_frames(parent_df, sub_df):
+    return align(parent_df["Date"].to_numpy(), sub_df["Date"].to_numpy(),
+                 *(sub_df[k].to_numpy(float) for k in ("Open", "High", "Low", "Close")))
@@ -0,0 +1,59 @@
+import time
+import numpy as np
+
+from backtester_p2.engine.paths import bar_shapes, bootstrap_index, paths_from_index
+from .analytics import PERIODS, summary
+from .config import SimConfig
+from .vector import run_vectorized_batch
+
+# Robustness runs: one seed -> n_paths block-bootstrapped price paths (engine/paths.py), each
+# pushed through run_vectorized_batch and scored with analytics.summary, `batch` paths at a
+# time so memory stays at a few (batch, bars) matrices. The same strategy on the original
+# data is reported alongside, with where it falls in the resampled distribution.
+
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+def sma_rows(C, n):
+    # simple moving average along the last axis of a (paths, bars) matrix
+    cs = np.cumsum(C, axis=-1); out = np.full_like(C, np.nan)
+    if n < 1 or n > C.shape[-1]: return out
+    out[..., n - 1] = cs[..., n - 1]
+    out[..., n:] = cs[..., n:] - cs[..., :-n]
+    out[..., n - 1:] /= n
+    return out
+
+def sma_strategy(n=50, size=1.0):
+    # long `size` while the close is above its n-bar SMA, flat otherwise (as sim/sweep.py)
+    return lambda O, H, L, C: np.where(C > sma_rows(C, n), size, 0.0)
+
+def monte_carlo(o, h, l, c, cfg: SimConfig, strategy, n_paths=1000, seed=0, block=20, batch=256, periods=PERIODS):
+    o, h, l, c = (np.asarray(x, float) for x in (o, h, l, c))
+    t0 = time.perf_counter()
+    shapes = bar_shapes(o, h, l, c)
+    idx = bootstrap_index(len(c), len(c), n_paths, seed, block)
+    parts = []
+    for k in range(0, n_paths, batch):
+        p = paths_from_index(shapes, idx[k:k + batch], start=c[0])
+        r = run_vectorized_batch(p["open"], p["close"], strategy(p["open"], p["high"], p["low"], p["close"]), cfg)
+        s = summary(r.equity, r.pos, p["close"], None, periods)
+        s["final_equity"] = r.equity[:, -1]
+        parts.append(s)
+    stats = {key: np.concatenate([s[key] for s in parts]) for key in parts[0]}
+    one = lambda a: a[None, :]
+    r = run_vectorized_batch(one(o), one(c), strategy(one(o), one(h), one(l), one(c)), cfg)
+    actual = {k: float(v[0]) for k, v in summary(r.equity, r.pos, one(c), None, periods).items()}
+    actual["final_equity"] = float(r.equity[0, -1])
+    return {"paths": stats, "actual": actual, "distribution": distribution(stats, actual),
+            "n_paths": n_paths, "bars": len(c), "seed": seed, "block": block, "seconds": time.perf_counter() - t0}
+
+def distribution(stats, actual=None, q=QUANTILES):
+    out = {}
+    for k, v in stats.items():
+        v = np.asarray(v, float); ok = v[np.isfinite(v)]
+        row = {"mean": float(ok.mean()) if len(ok) else float("nan")}
+        row.update({f"p{int(x * 100)}": float(np.quantile(ok, x)) if len(ok) else float("nan") for x in q})
+        if actual is not None and k in actual:
+            row["actual"] = actual[k]
+            row["actual_pct"] = float((ok < actual[k]).mean()) if len(ok) else float("nan")   # share of paths below it
+        out[k] = row
+    return out
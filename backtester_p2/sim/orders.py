@@ -1,7 +1,13 @@
+import itertools
 from dataclasses import dataclass, field
 from enum import Enum, auto
 from typing import Optional
 
+_order_ids = itertools.count(1)   # process-wide, monotonic
+
+def next_order_id() -> int:
+    return next(_order_ids)
+
 class Side(Enum):
     BUY = auto()
     SELL = auto()
@@ -19,7 +25,8 @@ class Order:
     type: OrderType = OrderType.MARKET
     limit_price: Optional[float] = None
     stop_price: Optional[float] = None
-    id: int = field(default_factory=lambda: id(object()))
+    id: int = field(default_factory=next_order_id)
     status: str = "OPEN"          # OPEN, FILLED, CANCELED
     filled_qty: float = 0.0
     avg_price: float = 0.0
+    fill_index: int = -1          # bar index of the fill
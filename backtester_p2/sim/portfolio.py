@@ -0,0 +1,152 @@
+import numpy as np
+
+from .config import SimConfig
+from .orders import OrderType, Side, next_order_id
+
+# Multi-symbol broker with one shared cash balance. Positions and pending orders are kept as
+# struct-of-arrays and each timestamp is processed for all symbols at once. Fill prices, fees,
+# slippage and the average-price / realized-P&L rules follow Broker._fill; several orders for
+# the same symbol within one bar are applied in placement order, one "round" at a time.
+
+MARKET, LIMIT, STOP = 0, 1, 2
+_TYPE = {OrderType.MARKET: MARKET, OrderType.LIMIT: LIMIT, OrderType.STOP: STOP}
+_SIDE = {Side.BUY: 1, Side.SELL: -1}
+
+class PortfolioBroker:
+    def __init__(self, cfg: SimConfig, n_symbols: int, capacity: int = 1024):
+        self.cfg = cfg; self.n = n_symbols
+        self.cash = float(cfg.cash)
+        self.qty = np.zeros(n_symbols); self.avg_price = np.zeros(n_symbols)
+        self.pnl_realized = np.zeros(n_symbols)
+        self.last_close = np.full(n_symbols, np.nan)
+        self.equity = float(cfg.cash); self.max_equity = 0.0; self.drawdown = 0.0
+        self.bar = -1
+        self._k = 0
+        self._alloc(capacity)
+
+    # --- pending orders (struct-of-arrays, placement order) ---
+    def _alloc(self, cap):
+        old = getattr(self, "_o", None)
+        self._o = {"id": np.zeros(cap, np.int64), "sym": np.zeros(cap, np.int64), "side": np.zeros(cap, np.int8),
+                   "type": np.zeros(cap, np.int8), "qty": np.zeros(cap), "limit": np.full(cap, np.nan), "stop": np.full(cap, np.nan)}
+        if old is not None:
+            for k, a in old.items(): self._o[k][:self._k] = a[:self._k]
+
+    @property
+    def open_orders(self):
+        return {k: a[:self._k].copy() for k, a in self._o.items()}
+
+    def place_many(self, sym, side, qty, type=MARKET, limit_price=np.nan, stop_price=np.nan):
+        sym = np.atleast_1d(np.asarray(sym, np.int64)); m = len(sym)
+        if m == 0: return np.zeros(0, np.int64)
+        if self._k + m > len(self._o["id"]): self._alloc(max(2 * len(self._o["id"]), self._k + m))
+        s = slice(self._k, self._k + m); o = self._o
+        ids = np.array([next_order_id() for _ in range(m)], np.int64)
+        o["id"][s] = ids; o["sym"][s] = sym
+        o["side"][s] = np.broadcast_to(np.asarray(side, np.int8), m)
+        o["type"][s] = np.broadcast_to(np.asarray(type, np.int8), m)
+        o["qty"][s] = np.broadcast_to(np.asarray(qty, float), m)
+        o["limit"][s] = np.broadcast_to(np.asarray(limit_price, float), m)
+        o["stop"][s] = np.broadcast_to(np.asarray(stop_price, float), m)
+        self._k += m
+        return ids
+
+    def place(self, sym, side, qty, type=OrderType.MARKET, limit_price=None, stop_price=None):
+        side = _SIDE.get(side, side); type = _TYPE.get(type, type)
+        return int(self.place_many([sym], side, qty, type,
+                                   np.nan if limit_price is None else limit_price,
+                                   np.nan if stop_price is None else stop_price)[0])
+
+    def cancel_all(self, sym=None):
+        if sym is None: self._k = 0; return
+        keep = ~np.isin(self._o["sym"][:self._k], np.atleast_1d(sym))
+        self._compact(keep)
+
+    def _compact(self, keep):
+        k = int(keep.sum())
+        for a in self._o.values(): a[:k] = a[:self._k][keep]
+        self._k = k
+
+    # --- fills ---
+    def _fill(self, sym, side, qty, price):
+        # sym is unique within a call; mirrors Broker._fill case by case
+        bps = self.cfg.slip_bps / 10000.0
+        buy = side > 0
+        price = np.where(buy, price * (1 + bps), price * (1 - bps))
+        notional = price * qty
+        fee = np.abs(notional) * (self.cfg.fee_bps / 10000.0)
+        Q = self.qty[sym]; A = self.avg_price[sym]; R = self.pnl_realized[sym]
+
+        new_b = Q + qty
+        A_b = np.where(new_b != 0, (A * Q + notional) / np.where(new_b != 0, new_b, 1.0), A)
+
+        closed = np.minimum(np.maximum(Q, 0.0), qty)
+        long_ = Q > 0; short = Q < 0; flat = ~(long_ | short)
+        remain = qty - closed
+        R_s = np.where(long_, R + (price - A) * closed, R)
+        Q_long = np.where(remain > 0, (Q - closed) - remain, Q - closed)
+        A_long = np.where(remain > 0, price, A)
+        new_s = Q - qty
+        A_short = np.where(new_s != 0, ((A * np.abs(Q)) + price * qty) / np.where(new_s != 0, np.abs(new_s), 1.0), price)
+        Q_s = np.where(long_, Q_long, np.where(short, new_s, Q - qty))
+        A_s = np.where(long_, A_long, np.where(short, A_short, price))
+
+        self.qty[sym] = np.where(buy, new_b, Q_s)
+        self.avg_price[sym] = np.where(buy, A_b, A_s)
+        self.pnl_realized[sym] = np.where(buy, R, R_s)
+        self.cash += float(np.where(buy, -(notional + fee), notional - fee).sum())
+        return price, fee
+
+    # --- main step: one timestamp, every symbol ---
+    def process_bar(self, i, o, h, l, c):
+        o = np.asarray(o, float); h = np.asarray(h, float); l = np.asarray(l, float); c = np.asarray(c, float)
+        k = self._k
+        fills = None
+        if k:
+            d = {key: a[:k] for key, a in self._o.items()}
+            sym = d["sym"]; side = d["side"]; typ = d["type"]
+            so, sh, sl, sc = o[sym], h[sym], l[sym], c[sym]
+            buy = side > 0
+            ref = so if self.cfg.policy == "next_open" else sc
+            lim_hit = np.where(buy, sl <= d["limit"], sh >= d["limit"])
+            stp_hit = np.where(buy, sh >= d["stop"], sl <= d["stop"])
+            hit = np.select([typ == MARKET, typ == LIMIT, typ == STOP], [np.isfinite(ref), lim_hit, stp_hit], False)
+            px = np.select([typ == MARKET, typ == LIMIT],
+                           [ref, d["limit"]],
+                           np.where(buy, np.maximum(d["stop"], so), np.minimum(d["stop"], so)))
+            t = np.flatnonzero(hit)
+            if len(t):
+                fills = self._apply(t, d, px)
+                self._compact(~hit)
+
+        self.last_close = np.where(np.isfinite(c), c, self.last_close)
+        held = self.qty != 0
+        self.equity = self.cash + float((self.qty[held] * self.last_close[held]).sum())
+        self.max_equity = max(self.max_equity, self.equity)
+        self.drawdown = self.max_equity - self.equity
+        self.bar = i
+        return fills
+
+    def _apply(self, t, d, px):
+        sym = d["sym"][t]
+        # rank of each triggered order among triggered orders of the same symbol
+        order = np.lexsort((t, sym))
+        s_sorted = sym[order]
+        start = np.r_[0, np.flatnonzero(s_sorted[1:] != s_sorted[:-1]) + 1]
+        rank_sorted = np.arange(len(t)) - np.repeat(start, np.diff(np.r_[start, len(t)]))
+        rank = np.empty(len(t), np.int64); rank[order] = rank_sorted
+        price = np.empty(len(t)); fee = np.empty(len(t))
+        for r in range(int(rank.max()) + 1):
+            m = rank == r; tt = t[m]
+            price[m], fee[m] = self._fill(d["sym"][tt], d["side"][tt], d["qty"][tt], px[tt])
+        return {"id": d["id"][t].copy(), "sym": sym, "side": d["side"][t].copy(), "qty": d["qty"][t].copy(),
+                "price": price, "fee": fee}
+
+    def run(self, O, H, L, C, on_bar=None):
+        # O/H/L/C: (bars, symbols); on_bar(i, broker) may place orders after bar i is processed
+        T = len(C); eq = np.empty(T)
+        for i in range(T):
+            self.process_bar(i, O[i], H[i], L[i], C[i])
+            eq[i] = self.equity
+            if on_bar is not None: on_bar(i, self)
+        return eq
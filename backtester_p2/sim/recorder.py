@@ -0,0 +1,99 @@
+from array import array
+import numpy as np
+
+from .orders import Side
+
+# Append-only run recorder for a Broker. Fills are stored with the account state right after
+# each fill. Cash, position, average price and realized P&L only change on fills, so the
+# per-bar columns (equity, drawdown, ...) are rebuilt on export from the fills and the close
+# prices. Give the recorder the close array the broker is driven with and bar processing
+# costs nothing extra; without one it appends each processed close to a flat buffer. Bars
+# are assumed to be processed in order (process_bar loops and Broker.seek do this). A float
+# close array is kept as given, not copied: a float32 (compact) one is widened exactly on export.
+# Fills go to preallocated NumPy columns that double when full; exports are views, so they
+# are zero-copy and stay valid while recording continues.
+
+FILL_COLS = (("bar", np.int64), ("order_id", np.int64), ("side", np.int8), ("qty", np.float64),
+             ("price", np.float64), ("fee", np.float64), ("pnl", np.float64), ("cash", np.float64),
+             ("pos", np.float64), ("avg_price", np.float64), ("pnl_realized", np.float64))
+
+class _Columns:
+    def __init__(self, cols, capacity):
+        self.n = 0
+        self.cols = {name: np.empty(capacity, dt) for name, dt in cols}
+    def append(self, values):
+        n = self.n
+        if n == len(self.cols["bar"]):
+            for k, a in self.cols.items():
+                b = np.empty(max(2 * len(a), 16), a.dtype); b[:n] = a[:n]; self.cols[k] = b
+        for a, v in zip(self.cols.values(), values): a[n] = v
+        self.n = n + 1
+    def truncate(self, bar):
+        self.n = int(np.searchsorted(self.cols["bar"][:self.n], bar, side="right"))
+    def view(self):
+        return {k: a[:self.n] for k, a in self.cols.items()}
+
+class Recorder:
+    def __init__(self, close=None, capacity=1024):
+        if close is not None:
+            close = np.asarray(close)
+            if close.dtype.kind != "f": close = close.astype(float)
+        self.close = close
+        self._fills = _Columns(FILL_COLS, capacity)
+        self._closes = None if self.close is not None else array("d")
+        self.broker = None; self.first_bar = 0; self.initial = None
+
+    def attach(self, broker):
+        s = broker.state
+        self.broker = broker; self.first_bar = broker.bar + 1
+        self.initial = (s.cash, s.pos.qty, s.pos.avg_price, s.pnl_realized, s.max_equity)
+
+    # --- hooks called by Broker ---
+    @property
+    def on_bar(self):
+        return self._closes.append       # Broker calls this with the close of each processed bar
+
+    def on_fill(self, i, o, price, fee, pnl, state):
+        self._fills.append((i, o.id, 1 if o.side == Side.BUY else -1, o.qty, price, fee, pnl,
+                            state.cash, state.pos.qty, state.pos.avg_price, state.pnl_realized))
+
+    def truncate(self, bar):
+        # drop everything after `bar` (the broker rewound to it)
+        self._fills.truncate(bar)
+        if self._closes is not None: del self._closes[max(0, bar + 1 - self.first_bar):]
+
+    # --- export ---
+    def fills(self):
+        return self._fills.view()
+
+    def fills_structured(self):
+        cols = self.fills()
+        out = np.empty(len(cols["bar"]), dtype=list(FILL_COLS))
+        for k, a in cols.items(): out[k] = a
+        return out
+
+    def bars(self):
+        if self._closes is None:
+            last = self.broker.bar if self.broker is not None else self.first_bar - 1
+            bar = np.arange(self.first_bar, last + 1, dtype=np.int64); close = self.close[bar].astype(float, copy=False)
+        else:
+            close = np.array(self._closes); bar = np.arange(self.first_bar, self.first_bar + len(close), dtype=np.int64)
+        f = self.fills()
+        k = np.searchsorted(f["bar"], bar, side="right")     # fills on or before each bar
+        out = {"bar": bar, "close": close}
+        for j, name in enumerate(("cash", "pos", "avg_price", "pnl_realized")):
+            out[name] = np.r_[self.initial[j], f[name]][k]
+        eq = out["cash"] + out["pos"] * close
+        out["equity"] = eq
+        out["max_equity"] = np.maximum(np.maximum.accumulate(eq), self.initial[4]) if len(eq) else eq
+        out["drawdown"] = out["max_equity"] - eq
+        return out
+
+    def to_arrow(self):
+        import pyarrow as pa
+        return pa.table(self.fills()), pa.table(self.bars())
+
+    def to_parquet(self, prefix):
+        import pyarrow.parquet as pq
+        fills, bars = self.to_arrow()
+        pq.write_table(fills, f"{prefix}_fills.parquet"); pq.write_table(bars, f"{prefix}_bars.parquet")
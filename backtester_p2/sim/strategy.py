@@ -0,0 +1,118 @@
+import time
+import numpy as np
+
+from backtester_p2.engine.cursor import BarCursor
+from .broker import Broker
+from .config import SimConfig
+from .orders import Order, OrderType, Side
+from .recorder import Recorder
+
+# Programmatic, bar-by-bar strategies. A Strategy precomputes its indicator arrays once
+# (indicators()), then on_bar(ctx) is called after every bar has been processed by the
+# broker, exactly where a Buy/Sell click lands in the UIs: orders placed in on_bar(ctx) at
+# bar i can fill from bar i+1.
+#
+# The loop is kept tight: prices and indicators are turned into Python lists up front, the
+# context is one object whose fields are read through ctx.i, and bars with no open orders
+# skip Broker.process_bar and are settled in bulk (Broker.mark_range) the next time the
+# broker is needed or at the end of the run. Read the account through ctx (pos, cash,
+# equity), which is current on every bar; broker.state's mark may lag until it is settled.
+
+class Context(BarCursor):
+    def __init__(self, broker, o, h, l, c, v=None, ind=None, dates=None):
+        super().__init__(len(c))
+        self.broker = broker; self.state = broker.state
+        self.o, self.h, self.l, self.c = o, h, l, c
+        self.v = v; self.ind = ind or {}; self.dates = dates
+        self.vars = {}                     # free-form per-run strategy state
+
+    # --- current bar ---
+    @property
+    def open(self): return self.o[self.i]
+    @property
+    def high(self): return self.h[self.i]
+    @property
+    def low(self): return self.l[self.i]
+    @property
+    def close(self): return self.c[self.i]
+    @property
+    def volume(self): return self.v[self.i] if self.v is not None else float("nan")
+    @property
+    def date(self): return self.dates[self.i] if self.dates is not None else None
+
+    def value(self, name, back=0):
+        # indicator `name` at the current bar, or `back` bars earlier (NaN before the start)
+        k = self.i - back
+        return self.ind[name][k] if k >= 0 else float("nan")
+
+    # --- account ---
+    @property
+    def pos(self): return self.state.pos.qty
+    @property
+    def cash(self): return self.state.cash
+    @property
+    def equity(self): return self.state.cash + self.state.pos.qty * self.c[self.i]
+    @property
+    def open_orders(self): return len(self.broker.book)
+
+    # --- orders ---
+    def order(self, side, qty=1.0, limit=None, stop=None):
+        typ = OrderType.LIMIT if limit is not None else OrderType.STOP if stop is not None else OrderType.MARKET
+        return self.broker.place(Order(ts_index=self.i, side=side, qty=float(qty), type=typ, limit_price=limit, stop_price=stop))
+
+    def buy(self, qty=1.0, limit=None, stop=None): return self.order(Side.BUY, qty, limit, stop)
+    def sell(self, qty=1.0, limit=None, stop=None): return self.order(Side.SELL, qty, limit, stop)
+    def cancel_all(self): self.broker.cancel_all()
+
+    def target(self, qty):
+        # MARKET order for the difference to `qty`; None when already there
+        d = qty - self.state.pos.qty
+        if d > 0: return self.order(Side.BUY, d)
+        if d < 0: return self.order(Side.SELL, -d)
+        return None
+
+class Strategy:
+    def indicators(self, o, h, l, c):
+        return {}                          # name -> array, computed once per run
+    def start(self, ctx): pass
+    def on_bar(self, ctx): pass
+    def finish(self, ctx): pass
+
+class SmaTrend(Strategy):
+    # long `size` while the close is above its n-bar SMA, flat otherwise
+    def __init__(self, n=50, size=1.0): self.n = n; self.size = size
+    def indicators(self, o, h, l, c):
+        from backtester_p2.engine.indicators import sma
+        return {"sma": sma(c, self.n)}
+    def on_bar(self, ctx):
+        m = ctx.ind["sma"][ctx.i]
+        if m != m: return
+        want = self.size if ctx.c[ctx.i] > m else 0.0
+        if want != ctx.state.pos.qty: ctx.target(want)
+
+def _list(a):
+    return a.tolist() if isinstance(a, np.ndarray) else list(a)
+
+def run_strategy(strategy, o, h, l, c, cfg: SimConfig, volume=None, dates=None, broker=None, record=True):
+    close = np.asarray(c, float)
+    if broker is None:
+        broker = Broker(cfg, checkpoint_every=0, recorder=Recorder(close) if record else None)
+    ind = {k: _list(v) for k, v in strategy.indicators(np.asarray(o, float), np.asarray(h, float),
+                                                       np.asarray(l, float), close).items()}
+    O, H, L, C = _list(o), _list(h), _list(l), close.tolist()
+    ctx = Context(broker, O, H, L, C, None if volume is None else _list(volume), ind, dates)
+    n = len(C); book = broker.book; process = broker.process_bar; on_bar = strategy.on_bar
+    bulk = not broker.checkpoint_every          # periodic checkpoints need every bar processed
+    t0 = time.perf_counter()
+    strategy.start(ctx)
+    done = broker.bar + 1                       # first bar the broker has not seen yet
+    for i in range(done, n):
+        if book.open or not bulk:
+            if done < i: broker.mark_range(done, i, C)
+            process(i, O[i], H[i], L[i], C[i]); done = i + 1
+        ctx.i = i
+        on_bar(ctx)
+    if done < n: broker.mark_range(done, n, C)
+    strategy.finish(ctx)
+    dt = time.perf_counter() - t0
+    return {"broker": broker, "context": ctx, "bars": n, "seconds": dt, "bars_per_sec": n / dt if dt > 0 else None}
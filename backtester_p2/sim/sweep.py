@@ -0,0 +1,118 @@
+import itertools, os, shutil, tempfile, time
+import multiprocessing as mp
+import numpy as np
+
+from backtester_p2.engine.indicators import sma
+from .config import SimConfig
+from .vector import run_vectorized
+from .analytics import PERIODS, summary
+
+# Parameter sweeps over SimConfig fields and the SMA period of a close>SMA long/flat strategy.
+# The OHLCV columns are written once to .npy files and memory-mapped read-only by every
+# worker, so a task only ships its small params dict.
+
+COLS = ("open", "high", "low", "close", "volume")
+SIM_KEYS = ("cash", "fee_bps", "slip_bps", "policy")
+
+def param_grid(**axes):
+    keys = list(axes)
+    return [dict(zip(keys, vals)) for vals in itertools.product(*(axes[k] for k in keys))]
+
+def share_arrays(arrays: dict, root=None):
+    root = tempfile.mkdtemp(prefix="bt_sweep_", dir=root)
+    for k, a in arrays.items():
+        np.save(os.path.join(root, f"{k}.npy"), np.ascontiguousarray(a))
+    return root
+
+def attach_arrays(root):
+    return {f[:-4]: np.load(os.path.join(root, f), mmap_mode="r") for f in os.listdir(root) if f.endswith(".npy")}
+
+# --- worker side ---
+_DATA = None
+_SMA_CACHE = {}                             # (id(close), len(close), n) -> SMA; cleared per sweep
+
+def _init_worker(root):
+    global _DATA
+    _DATA = attach_arrays(root); _SMA_CACHE.clear()
+
+def _target(close, n, size):
+    key = (id(close), len(close), n)
+    m = _SMA_CACHE.get(key)
+    if m is None:
+        m = _SMA_CACHE[key] = sma(close, n)
+    return np.where(close > m, size, 0.0)   # NaN warm-up compares False -> flat
+
+def _config(params, base):
+    return SimConfig(**{k: params.get(k, getattr(base, k)) for k in SIM_KEYS})
+
+def _simulate(params, base, d):
+    cfg = _config(params, base)
+    tgt = _target(d["close"], int(params.get("sma", 20)), float(params.get("size", 1.0)))
+    return run_vectorized(d["open"], d["high"], d["low"], d["close"], tgt, cfg)
+
+# store: run store root (store/runs.py); each run is saved there by the process that ran it,
+# with `manifest` (a dict) as its manifest
+def run_one(params, base: SimConfig, data=None, periods=PERIODS, store=None, manifest=None):
+    d = data if data is not None else _DATA
+    t0 = time.perf_counter()
+    r = _simulate(params, base, d)
+    stats = summary(r.equity, r.pos, d["close"], r.pnl_realized, periods)
+    dt = time.perf_counter() - t0
+    L = len(r.equity)
+    out = {**stats, "params": params, "equity": float(r.equity[-1]), "pnl_realized": float(r.pnl_realized[-1]),
+           "max_drawdown": float(r.drawdown.max()), "fills": int(len(r.fill_idx)),
+           "seconds": dt, "bars_per_sec": L / dt if dt > 0 else float("inf"), "pid": os.getpid()}
+    if store is not None:
+        from backtester_p2.store.runs import open_store
+        out["run_id"] = open_store(store).put(
+            manifest or {}, _config(params, base), params, {**stats, "final_equity": out["equity"], "pnl_realized": out["pnl_realized"]},
+            {"equity": r.equity, "pos": r.pos, "cash": r.cash, "pnl_realized": r.pnl_realized, "fill_idx": r.fill_idx,
+             "fill_qty": r.fill_qty, "fill_price": r.fill_price, "fill_fee": r.fill_fee})
+    return out
+
+def _run_task(args):
+    return run_one(*args)
+
+# --- driver side ---
+def sweep(arrays: dict, grid, base: SimConfig, workers=None, chunksize=None, periods=PERIODS, store=None, manifest=None):
+    grid = list(grid)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _SMA_CACHE.clear()
+        try:
+            for p in grid: yield run_one(p, base, arrays, periods, store, manifest)
+        finally:
+            _SMA_CACHE.clear()
+        return
+    if store is not None:
+        from backtester_p2.store.runs import open_store
+        open_store(store)._db()                    # create the index before the workers race to do it
+    root = share_arrays({k: arrays[k] for k in COLS if k in arrays})
+    try:
+        chunksize = chunksize or max(1, len(grid) // (workers * 8))
+        with mp.get_context().Pool(workers, initializer=_init_worker, initargs=(root,)) as pool:
+            yield from pool.imap_unordered(_run_task, ((p, base, None, periods, store, manifest) for p in grid), chunksize=chunksize)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+def rank(results, key="equity", reverse=True):
+    # NaN scores (e.g. the Sharpe of a run that never trades) sort last
+    bad = float("-inf") if reverse else float("inf")
+    return sorted(results, key=lambda r: bad if r[key] != r[key] else r[key], reverse=reverse)
+
+def sweep_matrix(arrays: dict, grid, base: SimConfig, periods=PERIODS):
+    # In-process sweep that keeps every curve: equity/pos/pnl as (runs, bars) matrices and
+    # one batched summary() over them. Memory is 3 x runs x bars x 8 bytes.
+    grid = list(grid); _SMA_CACHE.clear()
+    L = len(arrays["close"])
+    eq = np.empty((len(grid), L)); pos = np.empty_like(eq); pnl = np.empty_like(eq)
+    for k, p in enumerate(grid):
+        r = _simulate(p, base, arrays)
+        eq[k], pos[k], pnl[k] = r.equity, r.pos, r.pnl_realized
+    _SMA_CACHE.clear()
+    return {"equity": eq, "pos": pos, "pnl_realized": pnl}, summary(eq, pos, arrays["close"], pnl, periods)
+
+def arrays_from_df(df):
+    return {"open": df["Open"].to_numpy(float), "high": df["High"].to_numpy(float),
+            "low": df["Low"].to_numpy(float), "close": df["Close"].to_numpy(float),
+            "volume": df["Volume"].to_numpy(float)}
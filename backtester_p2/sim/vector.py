@@ -0,0 +1,115 @@
+from dataclasses import dataclass
+import numpy as np
+from .config import SimConfig
+
+# Whole-series simulation for target-position strategies. target[i] is the position wanted
+# after bar i; the difference is sent as one MARKET order that Broker would fill on bar i+1
+# (at its open under "next_open", at its close under "bar_inclusive").
+
+@dataclass
+class VectorResult:
+    cash: np.ndarray
+    pos: np.ndarray
+    avg_price: np.ndarray
+    equity: np.ndarray
+    pnl_realized: np.ndarray
+    max_equity: np.ndarray
+    drawdown: np.ndarray
+    fill_idx: np.ndarray      # bar index of each fill
+    fill_qty: np.ndarray      # signed quantity (+buy / -sell)
+    fill_price: np.ndarray    # price after slippage
+    fill_fee: np.ndarray
+
+def signal_to_target(signal, size=1.0):
+    return np.nan_to_num(np.asarray(signal, float)) * size
+
+def _avg_and_pnl(pos_before, qty, price, n_bars, idx):
+    # Same case analysis as Broker._fill, but only evaluated on the (few) fill bars.
+    avg = np.zeros(n_bars); pnl = np.zeros(n_bars)
+    a = 0.0; r = 0.0
+    for k in range(len(idx)):
+        p0 = pos_before[k]; q = qty[k]; px = price[k]
+        if q > 0:
+            new = p0 + q
+            if new != 0: a = (a * p0 + px * q) / new
+        else:
+            q = -q
+            if p0 > 0:
+                closed = min(p0, q)
+                r += (px - a) * closed
+                if q - closed > 0: a = px
+            elif p0 < 0:
+                new = p0 - q
+                a = ((a * abs(p0)) + px * q) / abs(new) if new != 0 else px
+            else:
+                a = px
+        avg[idx[k]] = a; pnl[idx[k]] = r
+    return avg, pnl
+
+def _ffill_at(values, idx, n_bars):
+    # carry values set at fill bars forward to every later bar
+    mark = np.zeros(n_bars, dtype=np.intp)
+    mark[idx] = idx
+    np.maximum.accumulate(mark, out=mark)
+    out = values[mark]
+    if len(idx): out[:idx[0]] = 0.0
+    else: out[:] = 0.0
+    return out
+
+def run_vectorized(o, h, l, c, target, cfg: SimConfig, realized=True) -> VectorResult:
+    o = np.asarray(o, float); c = np.asarray(c, float)
+    target = np.asarray(target, float)
+    L = len(c)
+    if len(target) != L: raise ValueError("target must have one value per bar")
+
+    # position held after processing bar i is the target chosen on bar i-1
+    pos = np.empty(L); pos[0] = 0.0; pos[1:] = target[:-1]
+    delta = np.diff(pos, prepend=0.0)
+    idx = np.flatnonzero(delta)
+
+    ref = o if cfg.policy == "next_open" else c
+    bps = cfg.slip_bps / 10000.0
+    dq = delta[idx]
+    buy = dq > 0
+    px = np.where(buy, ref[idx] * (1 + bps), ref[idx] * (1 - bps))
+    qty = np.abs(dq)
+    notional = px * qty
+    fee = np.abs(notional) * (cfg.fee_bps / 10000.0)
+
+    flow = np.zeros(L)
+    flow[idx] = np.where(buy, -(notional + fee), notional - fee)
+    flow[0] += cfg.cash
+    cash = np.cumsum(flow)
+
+    equity = cash + pos * c
+    max_equity = np.maximum(np.maximum.accumulate(equity), 0.0)
+    drawdown = max_equity - equity
+
+    if realized:
+        avg, pnl = _avg_and_pnl(pos[idx - 1], dq, px, L, idx)
+        avg = _ffill_at(avg, idx, L); pnl = _ffill_at(pnl, idx, L)
+    else:
+        avg = np.full(L, np.nan); pnl = np.full(L, np.nan)
+    return VectorResult(cash, pos, avg, equity, pnl, max_equity, drawdown, idx, dq, px, fee)
+
+def run_vectorized_batch(o, c, target, cfg: SimConfig) -> VectorResult:
+    # run_vectorized over (paths, bars) matrices at once, without the realized-P&L pass:
+    # avg_price / pnl_realized are NaN and the fill_* fields are None. Per-path values are
+    # identical to run_vectorized on that row.
+    o = np.asarray(o, float); c = np.asarray(c, float); target = np.asarray(target, float)
+    if target.shape != c.shape: raise ValueError("target must have one value per bar")
+    pos = np.zeros_like(c); pos[..., 1:] = target[..., :-1]
+    delta = np.diff(pos, axis=-1, prepend=0.0)
+    ref = o if cfg.policy == "next_open" else c
+    bps = cfg.slip_bps / 10000.0
+    buy = delta > 0
+    px = np.where(buy, ref * (1 + bps), ref * (1 - bps))
+    notional = px * np.abs(delta)
+    fee = np.abs(notional) * (cfg.fee_bps / 10000.0)
+    flow = np.where(delta != 0, np.where(buy, -(notional + fee), notional - fee), 0.0)
+    flow[..., 0] += cfg.cash
+    cash = np.cumsum(flow, axis=-1)
+    equity = cash + pos * c
+    max_equity = np.maximum(np.maximum.accumulate(equity, axis=-1), 0.0)
+    return VectorResult(cash, pos, np.full_like(c, np.nan), equity, np.full_like(c, np.nan), max_equity,
+                        max_equity - equity, None, None, None, None)
@@ -1,6 +1,9 @@
 import json
 from dataclasses import dataclass, asdict
 from datetime import datetime
+import pandas as pd
+
+from backtester_p2.engine.paths import bootstrap_paths
 
 @dataclass
 class Manifest:
@@ -9,4 +12,10 @@ class Manifest:
     def create(symbol, timeframe, data_meta, indicator_params, seed):
         return Manifest(symbol, timeframe, data_meta, indicator_params, seed, datetime.utcnow().isoformat())
     def to_json(self): return json.dumps(asdict(self), indent=2)
-def anonymize_frame(df, seed): return df  # stub for now
+def anonymize_frame(df, seed, block=20, start=100.0):
+    # same dates, a block-bootstrapped price path starting from `start`: `start` is the close
+    # before the first bar, whose own gap and body still apply (see engine/paths.py)
+    p = bootstrap_paths(df["Open"], df["High"], df["Low"], df["Close"], 1, seed, block, start=start,
+                        volume=df["Volume"] if "Volume" in df else None)
+    out = {"Date": df["Date"].to_numpy(), **{k.capitalize(): v[0] for k, v in p.items()}}
+    return pd.DataFrame(out, columns=[c for c in df.columns if c in out])
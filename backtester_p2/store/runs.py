@@ -0,0 +1,204 @@
+import argparse, json, os, re, shutil, sqlite3, sys, tempfile, time, uuid
+from dataclasses import asdict, is_dataclass
+import numpy as np
+
+# Local store for finished runs.
+#   <root>/index.sqlite                   one row per run: manifest fields, config, params, stats
+#   <root>/runs/<run id>/run.json         manifest, config, params and stats as given
+#   <root>/runs/<run id>/<column>.npy     result columns (equity, pos, fills, ...)
+# A run directory is written under a temporary name and renamed into place before its index
+# row is inserted, so readers never see half a run. The index is SQLite in WAL mode with a
+# busy timeout: any number of processes (e.g. sweep workers) can append at once, and each
+# process opens its own connection. Columns are memory-mapped on first access.
+#
+#   store.query(data_checksum=meta["checksum"], fee_bps__le=2, order_by="sharpe", limit=1)
+#   store.load(run_id)["equity"]
+
+DEFAULT_RUNS_DIR = os.environ.get("BACKTESTER_RUNS_DIR", os.path.join(os.path.expanduser("~"), ".local", "share", "backtester_p2", "runs"))
+
+FIELDS = (("created_at", "TEXT"), ("symbol", "TEXT"), ("timeframe", "TEXT"), ("data_checksum", "TEXT"),
+          ("indicator_params", "TEXT"), ("seed", "INTEGER"), ("cash", "REAL"), ("fee_bps", "REAL"),
+          ("slip_bps", "REAL"), ("policy", "TEXT"), ("params", "TEXT"), ("bars", "INTEGER"))
+METRICS = ("final_equity", "pnl_realized", "sharpe", "sortino", "cagr", "max_drawdown", "max_drawdown_pct",
+           "max_drawdown_bars", "volatility", "exposure", "turnover", "trades", "win_rate", "expectancy")
+COLUMNS = ("run_id",) + tuple(f for f, _ in FIELDS) + METRICS
+JSON_FIELDS = ("indicator_params", "params")
+INDEXES = ("data_checksum", "seed", "indicator_params", "fee_bps, slip_bps, policy", "created_at")
+OPS = {"eq": "=", "ne": "!=", "lt": "<", "le": "<=", "gt": ">", "ge": ">="}
+
+_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+def _canon(x):
+    return None if x is None else json.dumps(x, sort_keys=True, separators=(",", ":"), default=float)
+
+def _plain(x):
+    return asdict(x) if is_dataclass(x) else dict(x or {})
+
+def _int(v):
+    return None if v is None else int(v)            # numpy ints would bind as BLOBs
+
+def _num(v):
+    if v is None: return None
+    v = float(v)
+    return None if v != v else v                   # NaN -> NULL, so it sorts last
+
+def _wal(conn):
+    # switching the journal mode ignores the busy timeout, so only the first opener does it
+    for k in range(100):
+        try:
+            if conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal": return
+            conn.execute("PRAGMA journal_mode=WAL"); return
+        except sqlite3.OperationalError:
+            time.sleep(0.01 * (k + 1))
+    raise sqlite3.OperationalError("could not enable WAL on the run index")
+
+class Run:
+    def __init__(self, path, row):
+        self.path = path; self.row = row; self.run_id = row["run_id"]
+        self._info = None; self._cols = {}
+
+    @property
+    def info(self):
+        if self._info is None:
+            with open(os.path.join(self.path, "run.json")) as f: self._info = json.load(f)
+        return self._info
+
+    @property
+    def manifest(self): return self.info["manifest"]
+
+    def columns(self):
+        return sorted(f[:-4] for f in os.listdir(self.path) if f.endswith(".npy"))
+
+    def __getitem__(self, name):
+        a = self._cols.get(name)
+        if a is None:
+            a = self._cols[name] = np.load(os.path.join(self.path, name + ".npy"), mmap_mode="r").view(np.ndarray)
+        return a
+
+    def __contains__(self, name): return os.path.exists(os.path.join(self.path, name + ".npy"))
+
+class RunStore:
+    def __init__(self, root=DEFAULT_RUNS_DIR):
+        self.root = root
+        self._conn = None; self._pid = None
+
+    def _db(self):
+        if self._conn is None or self._pid != os.getpid():   # never share a connection across fork
+            os.makedirs(os.path.join(self.root, "runs"), exist_ok=True)
+            conn = sqlite3.connect(os.path.join(self.root, "index.sqlite"), timeout=60)
+            conn.row_factory = sqlite3.Row
+            _wal(conn); conn.execute("PRAGMA synchronous=NORMAL")
+            cols = ", ".join([f"{f} {t}" for f, t in FIELDS] + [f"{m} REAL" for m in METRICS])
+            with conn:
+                conn.execute(f"CREATE TABLE IF NOT EXISTS runs (run_id TEXT PRIMARY KEY, {cols})")
+                for k, ix in enumerate(INDEXES):
+                    conn.execute(f"CREATE INDEX IF NOT EXISTS runs_ix{k} ON runs ({ix})")
+            self._conn = conn; self._pid = os.getpid()
+        return self._conn
+
+    def _dir(self, run_id): return os.path.join(self.root, "runs", run_id)
+
+    # --- write ---
+    def put(self, manifest, cfg=None, params=None, stats=None, arrays=None, run_id=None):
+        m, c, stats = _plain(manifest), _plain(cfg), dict(stats or {})
+        run_id = run_id or uuid.uuid4().hex
+        db = self._db()
+        tmp = tempfile.mkdtemp(dir=os.path.join(self.root, "runs"), prefix=".tmp_")
+        try:
+            for k, a in (arrays or {}).items():
+                np.save(os.path.join(tmp, k + ".npy"), np.ascontiguousarray(a))
+            with open(os.path.join(tmp, "run.json"), "w") as f:
+                json.dump({"run_id": run_id, "manifest": m, "config": c, "params": params, "stats": stats}, f, default=float)
+            os.replace(tmp, self._dir(run_id))
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True); raise
+        eq = (arrays or {}).get("equity")
+        row = {"run_id": run_id, "created_at": m.get("created_at"), "symbol": m.get("symbol"), "timeframe": m.get("timeframe"),
+               "data_checksum": (m.get("data_meta") or {}).get("checksum"), "indicator_params": _canon(m.get("indicator_params")),
+               "seed": _int(m.get("seed")), "cash": c.get("cash"), "fee_bps": c.get("fee_bps"), "slip_bps": c.get("slip_bps"),
+               "policy": c.get("policy"), "params": _canon(params), "bars": None if eq is None else len(eq)}
+        row.update({k: _num(stats.get(k)) for k in METRICS})
+        with db:
+            db.execute(f"INSERT INTO runs ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})", tuple(row.values()))
+        return run_id
+
+    def delete(self, run_id):
+        with self._db() as db: db.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+        shutil.rmtree(self._dir(run_id), ignore_errors=True)
+
+    # --- read ---
+    # filters: field=value, field__<op>=value (op: eq ne lt le gt ge in), and param_<name> for a
+    # key of the run's params. Dict values match indicator_params/params exactly.
+    def query(self, order_by=None, desc=True, limit=None, **filters):
+        where, args = [], []
+        for key, v in filters.items():
+            name, _, op = key.partition("__"); op = op or "eq"
+            if name.startswith("param_") and _NAME.match(name[6:]):
+                col = f"json_extract(params, '$.{name[6:]}')"
+            elif name in COLUMNS: col = name
+            else: raise KeyError(f"unknown run field {name!r}")
+            if isinstance(v, dict): v = _canon(v)
+            if op == "in":
+                v = list(v); where.append(f"{col} IN ({', '.join('?' * len(v))})"); args += v
+            elif v is None and op in ("eq", "ne"):
+                where.append(f"{col} IS {'NOT ' if op == 'ne' else ''}NULL")
+            else:
+                where.append(f"{col} {OPS[op]} ?"); args.append(v)
+        sql = "SELECT * FROM runs" + (" WHERE " + " AND ".join(where) if where else "")
+        if order_by is not None:
+            if order_by not in COLUMNS: raise KeyError(f"unknown run field {order_by!r}")
+            sql += f" ORDER BY {order_by} IS NULL, {order_by} {'DESC' if desc else 'ASC'}"
+        if limit is not None: sql += f" LIMIT {int(limit)}"
+        rows = []
+        for r in self._db().execute(sql, args):
+            d = dict(r)
+            for k in JSON_FIELDS:
+                if d[k] is not None: d[k] = json.loads(d[k])
+            rows.append(d)
+        return rows
+
+    def best(self, metric="sharpe", **filters):
+        rows = self.query(order_by=metric, limit=1, **filters)
+        return rows[0] if rows else None
+
+    def load(self, run_id):
+        r = self._db().execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        if r is None: raise KeyError(run_id)
+        return Run(self._dir(run_id), dict(r))
+
+    def __len__(self):
+        return self._db().execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+_STORES = {}
+
+def open_store(root=DEFAULT_RUNS_DIR):
+    # one RunStore (and so one connection) per root and process
+    s = _STORES.get(root)
+    if s is None: s = _STORES[root] = RunStore(root)
+    return s
+
+def _value(s):
+    try: return json.loads(s)
+    except ValueError: return s
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Query the run store")
+    ap.add_argument("--root", type=str, default=DEFAULT_RUNS_DIR)
+    ap.add_argument("--where", action="append", help="field[__op]=value, e.g. fee_bps__le=2 or param_sma=50")
+    ap.add_argument("--order_by", type=str, default="sharpe")
+    ap.add_argument("--asc", action="store_true")
+    ap.add_argument("--limit", type=int, default=20)
+    a = ap.parse_args(argv)
+    filters = {}
+    for w in a.where or ():
+        k, _, v = w.partition("="); filters[k] = _value(v)
+    rows = RunStore(a.root).query(order_by=a.order_by, desc=not a.asc, limit=a.limit, **filters)
+    print(f"{'run_id':>32}  {'data':>16}  {'fee':>5}  {'slip':>5}  {'sharpe':>7}  {'cagr':>8}  {'equity':>14}  params")
+    f = lambda x, spec: format(x, spec) if x is not None else "-"
+    for r in rows:
+        print(f"{r['run_id']:>32}  {str(r['data_checksum'])[:16]:>16}  {f(r['fee_bps'], '5.2f')}  {f(r['slip_bps'], '5.2f')}  "
+              f"{f(r['sharpe'], '7.2f')}  {f(r['cagr'], '8.2%')}  {f(r['final_equity'], '14.2f')}  {r['params']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
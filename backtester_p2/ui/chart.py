@@ -4,63 +4,143 @@ import numpy as np
 import pandas as pd
 
 from backtester_p2.engine.cursor import BarCursor
-from backtester_p2.engine.indicators import sma
+from backtester_p2.engine.indicators import sma_multi
+from backtester_p2.engine.instrument import PROF
 from backtester_p2.sim.orders import Order, OrderType, Side
 from backtester_p2.sim.broker import Broker
 from backtester_p2.store.manifest import anonymize_frame
+from backtester_p2.ui.playback import Playback
+from backtester_p2.ui.viewport import bucket_starts, downsample_ohlcv
+
+_MONTHS = np.array(["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"])
+
+def date_labels(dates):
+    # vectorized "%b %d" for every bar, built once
+    d = np.asarray(dates).astype("datetime64[D]")
+    m = d.astype("datetime64[M]")
+    day = (d - m).astype(np.int64) + 1
+    return np.char.add(np.char.add(_MONTHS[m.astype(np.int64) % 12], " "), np.char.zfill(day.astype(str), 2))
 
 class TimeAxisItem(pg.AxisItem):
     def __init__(self, dates):
         super().__init__(orientation="bottom")
-        self._dates = dates
+        self._labels = date_labels(dates)
     def tickStrings(self, values, scale, spacing):
-        return [pd.Timestamp(self._dates[int(v)]).strftime("%b %d") if 0 <= int(v) < len(self._dates) else "" for v in values]
+        n = len(self._labels)
+        return [str(self._labels[int(v)]) if 0 <= int(v) < n else "" for v in values]
 
 class CandleItem(pg.GraphicsObject):
+    # Candles are drawn from cached QPictures of CHUNK bars each; only chunks overlapping the
+    # visible x-range are painted, and the partial last chunk is drawn directly so stepping
+    # forward touches a single bar's worth of cache. When more than LOD_BARS_PER_PX bars share
+    # a pixel, the visible range is drawn as one min/max stroke per pixel column instead.
+    CHUNK = 1024
+    LOD_BARS_PER_PX = 2.0
+    BODY_W = 0.6
+
     def __init__(self):
         super().__init__()
-        self._data = None
-        self._up = None
+        self._n = 0
+        self._o = self._h = self._l = self._c = None
+        self._pics = {}
         self._bounds = QtCore.QRectF()
         self._up_color = pg.mkColor(0,176,116)
         self._down_color = pg.mkColor(235,83,80)
-    def setData(self, ohlc, up_mask):
-        self._data = ohlc
-        self._up = up_mask.astype(bool)
-        xs = np.arange(len(ohlc))
-        if len(ohlc):
-            lows = ohlc[:,2]; highs = ohlc[:,1]
-            self._bounds = QtCore.QRectF(float(xs.min())-1,float(np.nanmin(lows))-1,
-                                         float(xs.max()-xs.min())+2,float(np.nanmax(highs)-np.nanmin(lows))+2)
+        self._pens = {}
+        for up, col in ((True, self._up_color), (False, self._down_color)):
+            pen = QtGui.QPen(col); pen.setCosmetic(True); self._pens[up] = pen
+        self._brushes = {True: QtGui.QBrush(self._up_color), False: QtGui.QBrush(self._down_color)}
+
+    def setData(self, o, h, l, c, count=None):
+        # full-length columns; `count` is how many leading bars are shown
+        self._o, self._h, self._l, self._c = (a if isinstance(a, np.ndarray) and a.dtype.kind == "f" else np.asarray(a, float) for a in (o, h, l, c))
+        self._up = self._c >= self._o
+        self._cum_lo = np.fmin.accumulate(self._l); self._cum_hi = np.fmax.accumulate(self._h)
+        self._pics.clear(); self._n = -1
+        self.set_count(len(self._c) if count is None else count)
+
+    def set_count(self, n):
+        n = int(min(max(n, 0), len(self._c)))
+        if n == self._n: return
+        self._n = n
+        if n:
+            lo = float(self._cum_lo[n-1]); hi = float(self._cum_hi[n-1])
+            self._bounds = QtCore.QRectF(-1.0, lo-1, float(n)+1, hi-lo+2)
+        else:
+            self._bounds = QtCore.QRectF()
         self.prepareGeometryChange(); self.update()
+
+    def _draw_range(self, p, a, b):
+        x = np.arange(a, b, dtype=float)
+        o, h, l, c, up = self._o[a:b], self._h[a:b], self._l[a:b], self._c[a:b], self._up[a:b]
+        top = np.minimum(o, c); height = np.abs(c - o); w = self.BODY_W
+        for flag in (True, False):
+            m = up == flag
+            if not m.any(): continue
+            p.setPen(self._pens[flag]); p.setBrush(self._brushes[flag])
+            p.drawLines([QtCore.QLineF(xi, li, xi, hi) for xi, li, hi in zip(x[m].tolist(), l[m].tolist(), h[m].tolist())])
+            p.drawRects([QtCore.QRectF(xi - w/2, ti, w, hh) for xi, ti, hh in zip(x[m].tolist(), top[m].tolist(), height[m].tolist())])
+
+    def _chunk_picture(self, k):
+        pic = self._pics.get(k)
+        if pic is None:
+            pic = QtGui.QPicture(); p = QtGui.QPainter(pic)
+            self._draw_range(p, k * self.CHUNK, (k + 1) * self.CHUNK)
+            p.end(); self._pics[k] = pic
+        return pic
+
+    def _visible(self):
+        vb = self.getViewBox()
+        if vb is None: return 0, self._n, 1.0
+        x0, x1 = vb.viewRange()[0]
+        a = max(0, int(np.floor(x0))); b = min(self._n, int(np.ceil(x1)) + 1)
+        return a, b, max(float(vb.width()), 1.0)
+
     def paint(self, p, *args):
-        if self._data is None: return
-        body_w = 0.6
-        for i,(o,h,l,c) in enumerate(self._data):
-            x=float(i); color=self._up_color if self._up[i] else self._down_color
-            pen=QtGui.QPen(color); pen.setCosmetic(True)
-            p.setPen(pen)
-            p.drawLine(QtCore.QPointF(x,l), QtCore.QPointF(x,h))  # wick
-            rect=QtCore.QRectF(x-body_w/2, min(o,c), body_w, abs(c-o))
-            p.fillRect(rect, color)
-            p.drawRect(rect)
+        with PROF.span("chart.paint"):
+            self._paint(p)
+
+    def _paint(self, p):
+        if not self._n: return
+        a, b, px = self._visible()
+        if b <= a: return
+        if (b - a) / px > self.LOD_BARS_PER_PX:
+            self._paint_lod(p, a, b, int(px)); return
+        full = self._n // self.CHUNK
+        for k in range(a // self.CHUNK, min(full, (b - 1) // self.CHUNK + 1)):
+            p.drawPicture(0, 0, self._chunk_picture(k))
+        tail = max(a, full * self.CHUNK)
+        if tail < b: self._draw_range(p, tail, b)
+
+    def _paint_lod(self, p, a, b, n_px):
+        starts = bucket_starts(a, b, n_px)
+        d = downsample_ohlcv(starts, b, self._o, self._h, self._l, self._c)
+        x = (starts + np.r_[starts[1:], b] - 1) / 2.0
+        up = d["close"] >= d["open"]
+        for flag in (True, False):
+            m = up == flag
+            if not m.any(): continue
+            p.setPen(self._pens[flag])
+            p.drawLines([QtCore.QLineF(xi, li, xi, hi) for xi, li, hi in zip(x[m].tolist(), d["low"][m].tolist(), d["high"][m].tolist())])
+
     def boundingRect(self): return self._bounds
 
 class ChartWindow(QtWidgets.QMainWindow):
-    def __init__(self, df, manifest, cfg):
+    def __init__(self, df, manifest, cfg, play_rate=200.0, fps=30.0):
         super().__init__()
         self.df = df; self.manifest = manifest; self.cfg=cfg
         self.cursor=BarCursor(len(df)); self.broker=Broker(cfg)
-        self._prep_arrays(); self._build_ui(); self._connect(); self._render(0)
+        self.playback=Playback(play_rate, fps)
+        self._prep_arrays(); self._build_ui(); self._connect(); self._seek()
 
     def _prep_arrays(self):
+        # views of the frame's own float columns (float32 in compact mode), not copies
+        col=lambda k: self.df[k].to_numpy() if self.df[k].dtype.kind=="f" else self.df[k].to_numpy(float)
         self.ts=self.df["Date"].to_numpy()
-        self.open=self.df["Open"].to_numpy(float)
-        self.high=self.df["High"].to_numpy(float)
-        self.low=self.df["Low"].to_numpy(float)
-        self.close=self.df["Close"].to_numpy(float)
-        self.vol=self.df["Volume"].to_numpy(float)
-        self.sma20=sma(self.close,20); self.sma50=sma(self.close,50); self.sma200=sma(self.close,200)
+        self.open=col("Open"); self.high=col("High"); self.low=col("Low"); self.close=col("Close"); self.vol=col("Volume")
+        with PROF.span("indicators"):
+            self.sma20,self.sma50,self.sma200=sma_multi(self.close,[20,50,200],dtype=self.close.dtype)
+        self.xs=np.arange(len(self.df),dtype=float)
 
     def _build_ui(self):
         cw=QtWidgets.QWidget(); layout=QtWidgets.QVBoxLayout(cw); self.setCentralWidget(cw)
@@ -68,9 +148,17 @@ class ChartWindow(QtWidgets.QMainWindow):
         self.a_next=QtGui.QAction("Next",self); self.a_prev=QtGui.QAction("Prev",self)
         self.a_buy=QtGui.QAction("Buy Mkt",self); self.a_sell=QtGui.QAction("Sell Mkt",self)
         for a in (self.a_next,self.a_prev,self.a_buy,self.a_sell): tb.addAction(a)
+        tb.addSeparator()
+        self.a_play=QtGui.QAction("Play",self); self.a_play.setShortcut(QtGui.QKeySequence(QtCore.Qt.Key_Space)); tb.addAction(self.a_play)
+        self.rate_box=QtWidgets.QSpinBox(); self.rate_box.setRange(1,1_000_000); self.rate_box.setSingleStep(100)
+        self.rate_box.setSuffix(" bars/s"); self.rate_box.setValue(int(self.playback.rate)); tb.addWidget(self.rate_box)
+        # autoplay: one frame per tick, at most playback.fps a second
+        self.timer=QtCore.QTimer(self); self.timer.setTimerType(QtCore.Qt.PreciseTimer)
 
         self.plot=pg.PlotWidget(axisItems={"bottom": TimeAxisItem(self.ts)})
+        self.plot.setClipToView(True); self.plot.setDownsampling(auto=True, mode="peak")
         self.candles=CandleItem(); self.plot.addItem(self.candles)
+        self.candles.setData(self.open,self.high,self.low,self.close,count=1)
         self.curve20=self.plot.plot(pen=pg.mkPen("k")); self.curve50=self.plot.plot(pen=pg.mkPen("b")); self.curve200=self.plot.plot(pen=pg.mkPen("orange"))
         layout.addWidget(self.plot)
 
@@ -82,15 +170,44 @@ class ChartWindow(QtWidgets.QMainWindow):
     def _connect(self):
         self.a_next.triggered.connect(self._advance); self.a_prev.triggered.connect(self._retreat)
         self.a_buy.triggered.connect(self._buy); self.a_sell.triggered.connect(self._sell)
+        self.a_play.triggered.connect(self._toggle_play); self.timer.timeout.connect(self._frame)
+        self.plot.sigXRangeChanged.connect(self._update_curves)
+        self.rate_box.valueChanged.connect(lambda v: setattr(self.playback,"rate",float(v)))
 
-    def _advance(self): self.cursor.next(); self.broker.process_bar(self.cursor.i,self.open[self.cursor.i],self.high[self.cursor.i],self.low[self.cursor.i],self.close[self.cursor.i]); self._render(self.cursor.i)
-    def _retreat(self): self.cursor.prev(); self._render(self.cursor.i)
+    def _seek(self):
+        with PROF.span("step_to"): self.cursor.i=self.broker.seek(self.cursor.i,self.open,self.high,self.low,self.close)
+        self._render(self.cursor.i)
+    def _advance(self): self.cursor.next(); self._seek()
+    def _retreat(self): self.cursor.prev(); self._seek()
+    def _update_curves(self,*_):
+        # only the visible bars, thinned to ~2 points per pixel: setData costs O(points), so a
+        # long history doesn't slow every step (the SMAs are smooth, a stride loses nothing)
+        a,b,px=self.candles._visible(); a=max(0,a-1)
+        if b<=a: a,b=0,self.candles._n
+        step=max(1,(b-a)//int(2*px)); a+=(b-1-a)%step       # keep the newest bar
+        x=self.xs[a:b:step]
+        for curve,y in ((self.curve20,self.sma20),(self.curve50,self.sma50),(self.curve200,self.sma200)): curve.setData(x,y[a:b:step],skipFiniteCheck=True)
+    def _toggle_play(self):
+        if not self.playback.playing and self.cursor.i>=self.cursor.n-1: return
+        self.playback.toggle(); self._sync_play()
+    def _sync_play(self):
+        if self.playback.playing: self.timer.start(max(1,int(self.playback.interval*1000)))
+        else: self.timer.stop()
+        self.a_play.setText("Pause" if self.playback.playing else "Play")
+    def _frame(self):
+        # every bar due since the last frame goes through the broker, then one redraw
+        i=self.playback.tick(self.cursor.i,self.cursor.n)
+        if i!=self.cursor.i: self.cursor.i=i; self._seek()
+        if not self.playback.playing: self._sync_play()
     def _buy(self): self.broker.place(Order(ts_index=self.cursor.i, side=Side.BUY, qty=1.0, type=OrderType.MARKET))
     def _sell(self): self.broker.place(Order(ts_index=self.cursor.i, side=Side.SELL, qty=1.0, type=OrderType.MARKET))
 
     def _render(self,i):
-        sl=slice(0,i+1); x=np.arange(i+1); ohlc=np.vstack([self.open[sl],self.high[sl],self.low[sl],self.close[sl]]).T
-        self.candles.setData(ohlc,self.close[sl]>=self.open[sl])
-        self.curve20.setData(x,self.sma20[:i+1]); self.curve50.setData(x,self.sma50[:i+1]); self.curve200.setData(x,self.sma200[:i+1])
+        with PROF.span("chart.render"): self._update_items(i)
+
+    def _update_items(self,i):
+        n=i+1
+        self.candles.set_count(n)
+        self._update_curves()
         self.hud.setText(f"Bar {i+1}/{len(self.df)} O:{self.open[i]:.2f} C:{self.close[i]:.2f}")
         self.lbl_cash.setText(f"{self.broker.state.cash:.2f}"); self.lbl_pos.setText(f"{self.broker.state.pos.qty:.2f}@{self.broker.state.pos.avg_price:.2f}")
@@ -1,3 +1,138 @@
-def run_cli(df, manifest, cfg):
-    print("CLI running — bars:", len(df))
-    print(df.head())
+import csv, json, sys, time
+from dataclasses import asdict
+import numpy as np
+
+from backtester_p2.engine.cursor import BarCursor
+from backtester_p2.sim.broker import Broker
+from backtester_p2.sim.orders import Order, OrderType, Side
+from backtester_p2.sim.recorder import Recorder
+from backtester_p2.sim.analytics import summary, periods_per_year
+from backtester_p2.engine.instrument import PROF
+
+# --- order journal ---
+# JSON list, JSON lines or CSV; one entry per order with either a bar index ("bar") or a
+# timestamp ("date", mapped to the first bar at or after it). The order is placed after that
+# bar is processed, exactly like clicking Buy/Sell on it in the UIs. {"action": "cancel_all"}
+# entries cancel every open order at that point.
+
+def read_journal(path):
+    if path.endswith(".csv"):
+        with open(path, newline="") as f:
+            return [{k: v for k, v in row.items() if v not in (None, "")} for row in csv.DictReader(f)]
+    with open(path) as f:
+        text = f.read().strip()
+    if text.startswith("["): return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+def journal_events(entries, dates):
+    out = []
+    for k, e in enumerate(entries):
+        if "bar" in e: bar = int(e["bar"])
+        elif "date" in e: bar = int(np.searchsorted(dates, np.datetime64(e["date"]), side="left"))
+        else: raise ValueError(f"journal entry {k} has neither 'bar' nor 'date'")
+        if e.get("action", "place") == "cancel_all":
+            out.append((bar, k, None)); continue
+        typ = OrderType[str(e.get("type", "MARKET")).upper()]
+        lp = e.get("limit_price"); sp = e.get("stop_price")
+        out.append((bar, k, Order(ts_index=bar, side=Side[str(e["side"]).upper()], qty=float(e.get("qty", 1.0)), type=typ,
+                                  limit_price=None if lp is None else float(lp), stop_price=None if sp is None else float(sp))))
+    out.sort(key=lambda t: (t[0], t[1]))
+    return out
+
+# --- headless replay ---
+def replay(df, cfg, events=(), intrabar=None):
+    n = len(df)
+    o = df["Open"].to_numpy(float).tolist(); h = df["High"].to_numpy(float).tolist()
+    close = df["Close"].to_numpy(float)
+    l = df["Low"].to_numpy(float).tolist(); c = close.tolist()
+    cursor = BarCursor(n); broker = Broker(cfg, checkpoint_every=0, recorder=Recorder(close), intrabar=intrabar)
+    process = broker.process_bar
+    placed = []; j = 0; m = len(events)
+    t0 = time.perf_counter()
+    while True:
+        i = cursor.i
+        process(i, o[i], h[i], l[i], c[i])
+        while j < m and events[j][0] <= i:
+            od = events[j][2]
+            if od is None: broker.cancel_all()
+            else: placed.append(broker.place(od))
+            j += 1
+        if i >= n - 1: break
+        cursor.next()
+    dt = time.perf_counter() - t0
+    return broker, placed, dt
+
+def _order_dict(o):
+    d = asdict(o); d["side"] = o.side.name; d["type"] = o.type.name
+    return d
+
+def run_cli(df, manifest, cfg, orders=None, out=None, intrabar=None, store=None):
+    events = journal_events(read_journal(orders), df["Date"].to_numpy()) if orders else []
+    with PROF.span("replay"):
+        broker, placed, dt = replay(df, cfg, events, intrabar)
+    fills = [_order_dict(o) for o in placed if o.status == "FILLED"]
+    fills.sort(key=lambda d: (d["fill_index"], d["id"]))
+    with PROF.span("analytics"):
+        curve = broker.recorder.bars()
+        stats = summary(curve["equity"], curve["pos"], curve["close"], curve["pnl_realized"], periods_per_year(df["Date"]))
+    status = {}
+    for o in placed: status[o.status] = status.get(o.status, 0) + 1
+    result = {
+        "manifest": asdict(manifest), "config": asdict(cfg),
+        "final_state": asdict(broker.state), "stats": stats,
+        "fills": fills, "orders": {"placed": len(placed), **status},
+        "throughput": {"bars": len(df), "orders": len(placed), "seconds": dt,
+                       "bars_per_sec": len(df) / dt if dt > 0 else None,
+                       "orders_per_sec": len(placed) / dt if dt > 0 else None},
+    }
+    if intrabar is not None:
+        result["intrabar"] = {"sub_bars": len(intrabar.c), "drilled_bars": broker.drilled_bars}
+    if store is not None:
+        from backtester_p2.store.runs import open_store
+        result["run_id"] = open_store(store).put(
+            manifest, cfg, {"orders": orders}, {**stats, "final_equity": broker.state.equity, "pnl_realized": broker.state.pnl_realized},
+            {**curve, **{"fill_" + k: a for k, a in broker.recorder.fills().items()}})
+    text = json.dumps(result, indent=2, default=float)
+    if out:
+        with open(out, "w") as f: f.write(text)
+        tp = result["throughput"]
+        print(f"Replayed {tp['bars']:,} bars, {tp['orders']:,} orders in {dt:.3f}s "
+              f"({tp['bars_per_sec'] or 0:,.0f} bars/s, {tp['orders_per_sec'] or 0:,.0f} orders/s) -> {out}", file=sys.stderr)
+    else:
+        print(text)
+    return result
+
+def _fmt_params(p): return " ".join(f"{k}={v}" for k, v in p.items())
+
+def run_sweep_cli(df, manifest, cfg, grid, workers=None, top=20, rank_by="equity", store=None):
+    from backtester_p2.sim.sweep import sweep, rank, arrays_from_df
+    arrays = arrays_from_df(df); periods = periods_per_year(df["Date"])
+    print(f"Sweep — bars: {len(df)} runs: {len(grid)} workers: {workers or 'auto'}")
+    results = []; t0 = time.perf_counter()
+    for k, r in enumerate(sweep(arrays, grid, cfg, workers=workers, periods=periods, store=store, manifest=asdict(manifest)), 1):
+        results.append(r)
+        print(f"[{k}/{len(grid)}] {_fmt_params(r['params'])}  equity={r['equity']:.2f}  {r['bars_per_sec']:,.0f} bars/s")
+    wall = time.perf_counter() - t0
+    print(f"\nTop {min(top, len(results))} by {rank_by}:")
+    print(f"{'rank':>4}  {'equity':>14}  {'pnl':>12}  {'max_dd':>12}  {'sharpe':>7}  {'cagr':>7}  {'win%':>6}  {'fills':>6}  {'bars/s':>12}  params")
+    for n, r in enumerate(rank(results, rank_by)[:top], 1):
+        print(f"{n:>4}  {r['equity']:>14.2f}  {r['pnl_realized']:>12.2f}  {r['max_drawdown']:>12.2f}  {r['sharpe']:>7.2f}  "
+              f"{r['cagr']:>7.2%}  {r['win_rate']:>6.1%}  {r['fills']:>6}  {r['bars_per_sec']:>12,.0f}  {_fmt_params(r['params'])}")
+    cpu = sum(r["seconds"] for r in results)
+    print(f"\n{len(results)} runs in {wall:.2f}s wall, {cpu:.2f}s run time "
+          f"({len(results)/wall if wall else 0:.1f} runs/s, {len(df)*len(results)/wall if wall else 0:,.0f} bars/s aggregate)")
+    if store is not None: print(f"runs saved to {store}")
+    return results
+
+def run_montecarlo_cli(df, manifest, cfg, n_paths=1000, block=20, sma=50, batch=256):
+    from backtester_p2.sim.montecarlo import monte_carlo, sma_strategy
+    print(f"Monte Carlo — bars: {len(df)} paths: {n_paths} block: {block} seed: {manifest.seed} strategy: close>SMA{sma}")
+    r = monte_carlo(df["Open"], df["High"], df["Low"], df["Close"], cfg, sma_strategy(sma), n_paths=n_paths,
+                    seed=manifest.seed, block=block, batch=batch, periods=periods_per_year(df["Date"]))
+    print(f"\n{'metric':>18}  {'p5':>12}  {'p25':>12}  {'median':>12}  {'p75':>12}  {'p95':>12}  {'actual':>12}  {'pctile':>6}")
+    for k, d in r["distribution"].items():
+        print(f"{k:>18}  {d['p5']:>12.4g}  {d['p25']:>12.4g}  {d['p50']:>12.4g}  {d['p75']:>12.4g}  {d['p95']:>12.4g}  "
+              f"{d['actual']:>12.4g}  {d['actual_pct']:>6.0%}")
+    print(f"\n{n_paths} paths in {r['seconds']:.2f}s ({n_paths * len(df) / r['seconds']:,.0f} bars/s)")
+    return r
+
@@ -0,0 +1,78 @@
+import numpy as np
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from backtester_p2.ui.viewport import bucket_starts, downsample_ohlcv, take_last
+
+# Plotly chart for the Streamlit front-end. chart_series() slices (and if needed buckets) the
+# visible range; build_figure() creates the traces once and update_figure() swaps their data
+# in place, so a step only pays for the bars on screen.
+
+UP, DOWN = "rgb(0,176,116)", "rgb(235,83,80)"
+SMAS = [("sma20", "SMA20", "rgba(0,0,0,0.6)"), ("sma50", "SMA50", "rgba(31,119,180,1)"), ("sma200", "SMA200", "rgba(255,127,14,1)")]
+KC = "rgba(43,106,230,1)"
+
+def chart_series(d, lo, hi, max_points=None):
+    # d: mapping with dates/open/high/low/close/vol and the overlay arrays
+    starts = bucket_starts(lo, hi, max_points)
+    lines = [k for k, _, _ in SMAS] + ["kc_dn", "kc_up", "kc_mid"]
+    if starts is None:
+        sl = slice(lo, hi)
+        s = {"x": d["dates"][sl], "open": d["open"][sl], "high": d["high"][sl], "low": d["low"][sl],
+             "close": d["close"][sl], "volume": d["vol"][sl]}
+        for k in lines: s[k] = d[k][sl]
+    else:
+        s = downsample_ohlcv(starts, hi, d["open"], d["high"], d["low"], d["close"], d["vol"])
+        s["x"] = d["dates"][starts]
+        for k in lines: s[k] = take_last(d[k], starts, hi)
+    s["vol_colors"] = np.where(s["close"] >= s["open"], "rgba(0,176,116,0.6)", "rgba(235,83,80,0.6)")
+    return s
+
+def build_figure(s, show_volume=True, show_keltner=True):
+    fig = make_subplots(
+        rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.03,
+        row_heights=[0.78, 0.22], specs=[[{"type": "xy"}], [{"type": "xy"}]]
+    )
+    fig.add_trace(go.Candlestick(
+        x=s["x"], open=s["open"], high=s["high"], low=s["low"], close=s["close"],
+        increasing_line_color=UP, decreasing_line_color=DOWN,
+        increasing_fillcolor=UP, decreasing_fillcolor=DOWN,
+        name="OHLC", showlegend=False
+    ), row=1, col=1)
+    for key, name, color in SMAS:
+        fig.add_trace(go.Scatter(x=s["x"], y=s[key], mode="lines", name=name,
+                                 line=dict(width=1.2, color=color)), row=1, col=1)
+    if show_keltner:
+        # draw lower first, then upper with fill between
+        fig.add_trace(go.Scatter(x=s["x"], y=s["kc_dn"], mode="lines", name="KC Lower",
+                                 line=dict(width=1.1, color=KC), showlegend=False), row=1, col=1)
+        fig.add_trace(go.Scatter(x=s["x"], y=s["kc_up"], mode="lines", name="KC Upper",
+                                 line=dict(width=1.1, color=KC), fill="tonexty",
+                                 fillcolor="rgba(43,106,230,0.15)", showlegend=False), row=1, col=1)
+        fig.add_trace(go.Scatter(x=s["x"], y=s["kc_mid"], mode="lines", name="KC Mid",
+                                 line=dict(width=1.0, color="rgba(43,106,230,0.9)", dash="dot")), row=1, col=1)
+    if show_volume:
+        fig.add_trace(go.Bar(x=s["x"], y=s["volume"], marker_color=s["vol_colors"], name="Volume",
+                             opacity=0.8), row=2, col=1)
+    fig.update_layout(
+        height=600, template="plotly_white",
+        margin=dict(l=10, r=10, t=10, b=10),
+        xaxis1=dict(rangeslider=dict(visible=False)),
+        yaxis1=dict(title="Price", side="right"),
+        yaxis2=dict(title="Volume", rangemode="tozero"),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, x=0.02),
+        uirevision="chart",     # keep the user's zoom/pan across data updates
+    )
+    return fig
+
+def update_figure(fig, s, show_volume=True, show_keltner=True):
+    # same trace order as build_figure
+    with fig.batch_update():
+        t = iter(fig.data)
+        next(t).update(x=s["x"], open=s["open"], high=s["high"], low=s["low"], close=s["close"])
+        for key, _, _ in SMAS: next(t).update(x=s["x"], y=s[key])
+        if show_keltner:
+            for key in ("kc_dn", "kc_up", "kc_mid"): next(t).update(x=s["x"], y=s[key])
+        if show_volume:
+            next(t).update(x=s["x"], y=s["volume"], marker_color=s["vol_colors"])
+    return fig
@@ -0,0 +1,40 @@
+import time
+
+# Autoplay pacing shared by both UIs. On every frame the simulation advances as many bars as
+# the wall clock says are due at `rate` bars/s (Broker.seek runs them at full speed), and the
+# chart is redrawn once, so a redraw covers about rate/fps bars. A late frame catches up, but
+# by no more than max_lag seconds' worth of bars, so a slow redraw never builds a backlog.
+
+class Playback:
+    def __init__(self, rate=200.0, fps=30.0, max_lag=0.25):
+        self.rate = float(rate); self.fps = float(fps); self.max_lag = max_lag
+        self.playing = False
+        self._t = None; self._carry = 0.0
+        self.frames = 0; self.bars = 0
+
+    @property
+    def interval(self):
+        return 1.0 / self.fps              # seconds between redraws
+
+    def play(self):
+        self.playing = True; self._t = None; self._carry = 0.0
+
+    def pause(self):
+        self.playing = False
+
+    def toggle(self):
+        if self.playing: self.pause()
+        else: self.play()
+
+    # Bar to show this frame, from the current bar i of n; pauses itself on the last bar.
+    def tick(self, i, n, now=None):
+        if not self.playing: return i
+        now = time.perf_counter() if now is None else now
+        if self._t is None: self._t = now - self.interval      # first frame moves one frame's worth
+        dt = min(now - self._t, max(self.max_lag, 2 * self.interval)); self._t = now
+        due = self._carry + dt * self.rate
+        k = int(due); self._carry = due - k
+        j = min(i + k, n - 1)
+        if j >= n - 1: self.playing = False
+        self.frames += 1; self.bars += j - i
+        return j
@@ -0,0 +1,23 @@
+import numpy as np
+
+# Viewport helpers shared by the chart front-ends: pick the visible bar range and, when it
+# holds more bars than can usefully be drawn, aggregate it into buckets that keep every
+# bucket's open, extreme high/low and close, so spikes survive downsampling.
+
+def window_bounds(i, size=None):
+    hi = i + 1
+    return (max(0, hi - size) if size else 0), hi
+
+def bucket_starts(lo, hi, max_points):
+    if not max_points or hi - lo <= max_points: return None
+    return np.unique(np.linspace(lo, hi, max_points + 1).astype(np.int64)[:-1])
+
+def downsample_ohlcv(starts, hi, o, h, l, c, v=None):
+    lo = int(starts[0]); rel = starts - lo
+    ends = np.r_[starts[1:], hi] - 1
+    out = {"open": o[starts], "high": np.fmax.reduceat(h[lo:hi], rel), "low": np.fmin.reduceat(l[lo:hi], rel), "close": c[ends]}
+    if v is not None: out["volume"] = np.add.reduceat(np.nan_to_num(v[lo:hi]), rel)
+    return out
+
+def take_last(y, starts, hi):
+    return y[np.r_[starts[1:], hi] - 1]
@@ -1,167 +1,107 @@
 # streamlit_app.py
+import io, json
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-# import plotly.graph_objects as go
 # Reuse your existing engine
 from backtester_p2.io.csv_loader import load_ohlcv
-from backtester_p2.engine.indicators import sma, rsi
+from backtester_p2.io.cache import DEFAULT_CACHE_DIR, source_key
+from backtester_p2.io.stream import stream_ohlcv, frame_from_columns, UnsortedError
+from backtester_p2.engine.shared import SHARED, COMPACT, dataset, indicators, upload_id
 from backtester_p2.sim.config import SimConfig
 from backtester_p2.sim.broker import Broker
 from backtester_p2.sim.orders import Order, OrderType, Side
+from backtester_p2.sim.recorder import Recorder
+from backtester_p2.sim.analytics import summary, periods_per_year
+from backtester_p2.engine.instrument import PROF, Instrument
+from backtester_p2.ui.playback import Playback
+from backtester_p2.ui.viewport import window_bounds
+from backtester_p2.ui.figure import chart_series, build_figure, update_figure
 
 st.set_page_config(page_title="Manual Backtester (Streamlit)", layout="wide")
 
-def ema(x: np.ndarray, n: int) -> np.ndarray:
-    return pd.Series(x).ewm(span=n, adjust=False).mean().to_numpy()
-
-def true_range(h: np.ndarray, l: np.ndarray, c: np.ndarray) -> np.ndarray:
-    prev_c = np.r_[c[0], c[:-1]]
-    return np.maximum(h - l, np.maximum(np.abs(h - prev_c), np.abs(l - prev_c)))
-
-def atr(h: np.ndarray, l: np.ndarray, c: np.ndarray, n: int = 10) -> np.ndarray:
-    tr = true_range(h, l, c)
-    # Wilder-like smoothing via EMA(alpha=1/n)
-    return pd.Series(tr).ewm(alpha=1.0 / n, adjust=False).mean().to_numpy()
-
 # ---------- helpers ----------
-def load_df(file) -> pd.DataFrame:
-    if isinstance(file, str):
-        df, _ = load_ohlcv(file)
-    else:
-        # Uploaded file-like object
-        df = pd.read_csv(file)
+def prof() -> Instrument:
+    # per-session timings, so one session's Profile toggle and Reset leave the others alone;
+    # BACKTESTER_PROFILE=1 only sets the default for new sessions
+    if "prof" not in st.session_state: st.session_state.prof = Instrument(enabled=PROF.enabled)
+    return st.session_state.prof
+
+def load_data(file, compact=False) -> dict:
+    # parsed once per distinct dataset per server process and shared read-only by every session;
+    # compact keeps prices and indicators as float32 (see engine/shared.py for the tolerances)
+    dtype = COMPACT if compact else float
+    with prof().span("load"):
+        if isinstance(file, str):
+            return dataset(source_key(file), lambda: load_ohlcv(file, cache_dir=DEFAULT_CACHE_DIR), dtype=dtype)
+        raw = file.getvalue()
+        return dataset(upload_id(raw), lambda: _parse_upload(io.BytesIO(raw), raw), dtype=dtype)
+
+def _parse_upload(buf, raw):
+    # Uploaded file-like object: stream it in chunks (memory bounded by chunk size)
+    try:
+        cols, meta = stream_ohlcv(buf)
+        return frame_from_columns(cols), meta
+    except UnsortedError:
+        buf.seek(0)
+        df = pd.read_csv(buf)
         # Ensure the same schema as csv_loader requires
         df["Date"] = pd.to_datetime(df["Date"])
         df = df.sort_values("Date").reset_index(drop=True)
-    return df
+        return df, {"rows": len(df), "checksum": upload_id(raw)}
 
-def init_state(df: pd.DataFrame):
-    st.session_state.df = df
+def init_state(data: dict):
+    st.session_state.data = data
+    st.session_state.df = data["df"]
     st.session_state.i = 0
+    st.session_state.fig = None
     st.session_state.cfg = SimConfig(
         cash=st.session_state.get("init_cash", 100000.0),
         fee_bps=st.session_state.get("init_fee_bps", 1.0),
         slip_bps=st.session_state.get("init_slip_bps", 2.0),
         policy=st.session_state.get("init_policy", "next_open"),
     )
-    st.session_state.broker = Broker(st.session_state.cfg)
-    # numpy arrays for speed
-    st.session_state.open = df["Open"].to_numpy(float)
-    st.session_state.high = df["High"].to_numpy(float)
-    st.session_state.low  = df["Low"].to_numpy(float)
-    st.session_state.close= df["Close"].to_numpy(float)
-    st.session_state.vol  = df.get("Volume", pd.Series([np.nan]*len(df))).to_numpy(float)
-    # indicators
-    c = st.session_state.close
-    # c = st.session_state.close
-    h = st.session_state.high
-    l = st.session_state.low
-
-    # SMAs
-    st.session_state.sma20  = sma(c, 20)
-    st.session_state.sma50  = sma(c, 50)
-    st.session_state.sma200 = sma(c, 200)
-
-    # --- Keltner Channels (EMA20 ± 2*ATR10) ---
-    kc_mid = ema(c, 20)
-    atr10  = atr(h, l, c, 10)
-    kc_mult = 2.0
-    st.session_state.kc_mid = kc_mid
-    st.session_state.kc_up  = kc_mid + kc_mult * atr10
-    st.session_state.kc_dn  = kc_mid - kc_mult * atr10
-
-    st.session_state.sma20  = sma(c, 20)
-    st.session_state.sma50  = sma(c, 50)
-    st.session_state.sma200 = sma(c, 200)
-    st.session_state.rsi14  = rsi(c, 14)
+    # shared read-only arrays; only the broker (and the bar index) are per session
+    for k in ("open", "high", "low", "close", "vol", "dates"):
+        st.session_state[k] = data[k]
+    with prof().span("indicators"):
+        # SMA20/50/200, Keltner (EMA20 ± 2*ATR10) and RSI14, computed once per dataset
+        for k, v in indicators(data).items(): st.session_state[k] = v
+    st.session_state.periods = periods_per_year(st.session_state.dates)
+    # the recorder keeps fills and rebuilds the equity curve from the close column on demand
+    st.session_state.broker = Broker(st.session_state.cfg, recorder=Recorder(st.session_state.close))
+    st.session_state.broker.instrument(prof().enabled, prof())
+    st.session_state.broker.seek(0, st.session_state.open, st.session_state.high, st.session_state.low, st.session_state.close)
 
 def step_to(i: int):
     i = int(np.clip(i, 0, len(st.session_state.df)-1))
-    # process bar i with broker
-    st.session_state.broker.process_bar(
-        i,
-        st.session_state.open[i],
-        st.session_state.high[i],
-        st.session_state.low[i],
-        st.session_state.close[i],
-    )
-    st.session_state.i = i
-
-
-
-def plot_chart(i: int, show_volume: bool = True, show_keltner: bool = True):
-    df = st.session_state.df
-    sl = slice(0, i + 1)
-    dfv = df.iloc[sl].copy()
-    x = dfv["Date"]
-
-    fig = make_subplots(
-        rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.03,
-        row_heights=[0.78, 0.22], specs=[[{"type": "xy"}], [{"type": "xy"}]]
-    )
-
-    # Candles (row 1)
-    fig.add_trace(go.Candlestick(
-        x=x,
-        open=dfv["Open"], high=dfv["High"], low=dfv["Low"], close=dfv["Close"],
-        increasing_line_color="rgb(0,176,116)", decreasing_line_color="rgb(235,83,80)",
-        increasing_fillcolor="rgb(0,176,116)", decreasing_fillcolor="rgb(235,83,80)",
-        name="OHLC", showlegend=False
-    ), row=1, col=1)
-
-    # SMAs (row 1)
-    for arr, name, color in [
-        (st.session_state.sma20[:i+1], "SMA20", "rgba(0,0,0,0.6)"),
-        (st.session_state.sma50[:i+1], "SMA50", "rgba(31,119,180,1)"),
-        (st.session_state.sma200[:i+1], "SMA200", "rgba(255,127,14,1)"),
-    ]:
-        fig.add_trace(go.Scatter(x=x, y=arr, mode="lines", name=name,
-                                 line=dict(width=1.2, color=color)), row=1, col=1)
-
-    # Keltner Channels (row 1)
-    if show_keltner:
-        up = st.session_state.kc_up[:i+1]
-        mid = st.session_state.kc_mid[:i+1]
-        dn = st.session_state.kc_dn[:i+1]
-
-        # draw lower first, then upper with fill between
-        fig.add_trace(go.Scatter(
-            x=x, y=dn, mode="lines", name="KC Lower",
-            line=dict(width=1.1, color="rgba(43,106,230,1)"), showlegend=False
-        ), row=1, col=1)
-        fig.add_trace(go.Scatter(
-            x=x, y=up, mode="lines", name="KC Upper",
-            line=dict(width=1.1, color="rgba(43,106,230,1)"),
-            fill="tonexty", fillcolor="rgba(43,106,230,0.15)",
-            showlegend=False
-        ), row=1, col=1)
-        # mid (optional thin line)
-        fig.add_trace(go.Scatter(
-            x=x, y=mid, mode="lines", name="KC Mid",
-            line=dict(width=1.0, color="rgba(43,106,230,0.9)", dash="dot")
-        ), row=1, col=1)
-
-    # Volume in a separate pane (row 2)
-    if show_volume:
-        vols = st.session_state.vol[:i+1]
-        ups  = st.session_state.close[:i+1] >= st.session_state.open[:i+1]
-        colors = np.where(ups, "rgba(0,176,116,0.6)", "rgba(235,83,80,0.6)")
-        fig.add_trace(go.Bar(
-            x=x, y=vols, marker_color=colors, name="Volume",
-            opacity=0.8
-        ), row=2, col=1)
-
-    fig.update_layout(
-        height=600, template="plotly_white",
-        margin=dict(l=10, r=10, t=10, b=10),
-        xaxis1=dict(rangeslider=dict(visible=False)),
-        yaxis1=dict(title="Price", side="right"),
-        yaxis2=dict(title="Volume", rangemode="tozero"),
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, x=0.02),
-    )
+    # bring the broker to bar i: rewinds restore a checkpoint, jumps replay every bar in between
+    with prof().span("step_to"):
+        st.session_state.i = st.session_state.broker.seek(
+            i,
+            st.session_state.open,
+            st.session_state.high,
+            st.session_state.low,
+            st.session_state.close,
+        )
+
+
+
+def plot_chart(i: int, show_volume: bool = True, show_keltner: bool = True,
+               window: int = 300, full_history: bool = False, max_points: int = 1500):
+    # only the visible range is sent to Plotly; full history is bucketed to max_points
+    lo, hi = window_bounds(i, None if full_history else window)
+    with prof().span("chart.series"):
+        series = chart_series(st.session_state, lo, hi, max_points)
+    key = (show_volume, show_keltner)
+    fig = st.session_state.get("fig")
+    if fig is None or st.session_state.get("fig_key") != key:
+        with prof().span("chart.build"):
+            fig = build_figure(series, show_volume, show_keltner)
+        st.session_state.fig, st.session_state.fig_key = fig, key
+    else:
+        with prof().span("chart.update"):
+            update_figure(fig, series, show_volume, show_keltner)
     return fig
 
 
@@ -175,21 +115,32 @@ st.session_state.init_cash = st.sidebar.number_input("Starting Cash", 1000.0, 1e
 st.session_state.init_fee_bps = st.sidebar.number_input("Fee (bps)", 0.0, 100.0, 1.0, step=0.5)
 st.session_state.init_slip_bps = st.sidebar.number_input("Slippage (bps)", 0.0, 100.0, 2.0, step=0.5)
 st.session_state.init_policy = st.sidebar.selectbox("Policy", ["next_open", "bar_inclusive"])
+compact = st.sidebar.checkbox("Compact memory (float32)", value=False, help="About half the RAM per dataset; applies on load / Reset Session")
+
+def _toggle_profile():
+    prof().enable(st.session_state.profile)
+    if "broker" in st.session_state: st.session_state.broker.instrument(prof().enabled, prof())
+
+st.sidebar.checkbox("Profile (debug panel)", value=prof().enabled, key="profile", on_change=_toggle_profile,
+                    help="times this session only")
 
 # Initialize state once DF is chosen
 if "df" not in st.session_state or st.sidebar.button("Reset Session"):
     if uploaded_csv is not None:
-        df = load_df(uploaded_csv)
+        data = load_data(uploaded_csv, compact)
     elif use_sample:
-        df = load_df("backtester_p2/data/sample.csv")
+        data = load_data("backtester_p2/data/sample.csv", compact)
     else:
         st.info("Upload a CSV or tick 'Use sample data'.")
         st.stop()
-    init_state(df)
+    init_state(data)
+if "playback" not in st.session_state: st.session_state.playback = Playback(fps=10)
 
 # ---------- main area ----------
 df = st.session_state.df
 i = st.session_state.i
+pb = st.session_state.playback
+pb.fps = float(st.session_state.get("play_fps", pb.fps))   # the slider sits below the fragment that reads it
 
 col_top1, col_top2 = st.columns([3, 1], gap="large")
 
@@ -197,10 +148,26 @@ with col_top1:
     st.subheader("Chart")
     show_vol = st.checkbox("Show Volume", value=True, key="show_vol")
     show_kc  = st.checkbox("Show Keltner Channels", value=True, key="show_kc")
-    fig = plot_chart(i, show_volume=show_vol, show_keltner=show_kc)
-    st.plotly_chart(fig, use_container_width=True)
-    # fig = plot_chart(i)
-    # st.plotly_chart(fig, use_container_width=True)
+    vc1, vc2 = st.columns([1, 1])
+    view_n = vc1.number_input("Viewport (bars)", 20, 100000, 300, step=50, key="view_n")
+    full_hist = vc2.checkbox("Full history (downsampled)", value=False, key="full_hist")
+
+    # Autoplay: while playing only this fragment reruns, every 1/fps s. Each run puts every bar
+    # due at the target speed through the broker (Broker.seek) and redraws the chart once.
+    @st.fragment(run_every=pb.interval if pb.playing else None)
+    def chart_view():
+        playing = pb.playing
+        if playing:
+            with prof().span("autoplay.frame"): step_to(pb.tick(st.session_state.i, len(df)))
+        i = st.session_state.i
+        fig = plot_chart(i, show_volume=show_vol, show_keltner=show_kc, window=int(view_n), full_history=full_hist)
+        with prof().span("chart.plotly_chart"):     # figure serialization and hand-off to the browser
+            st.plotly_chart(fig, use_container_width=True)
+        s = st.session_state.broker.state
+        st.caption(f"Bar {i+1}/{len(df)}  —  O:{st.session_state.open[i]:.2f}  H:{st.session_state.high[i]:.2f}  "
+                   f"L:{st.session_state.low[i]:.2f}  C:{st.session_state.close[i]:.2f}  —  Equity {s.equity:,.2f}  Pos {s.pos.qty:.4f}")
+        if playing and not pb.playing: st.rerun()   # stopped on the last bar: refresh the whole page
+    chart_view()
 
 with col_top2:
     st.subheader("Controls")
@@ -208,6 +175,11 @@ with col_top2:
     step_cols = st.columns(3)
     if step_cols[0].button("⟵ Prev", use_container_width=True): step_to(i-1)
     if step_cols[1].button("Next ⟶", use_container_width=True): step_to(i+1)
+    pc1, pc2 = st.columns([1, 2])
+    pc1.button("⏸ Pause" if pb.playing else "▶ Play", use_container_width=True, on_click=pb.toggle,
+               disabled=not pb.playing and i >= len(df) - 1)
+    pb.rate = float(pc2.number_input("Speed (bars/s)", 1, 1_000_000, int(pb.rate), step=100, key="play_rate"))
+    pb.fps = float(st.slider("Max redraws/s", 1, 30, 10, key="play_fps", help="chart updates per second while playing; bars in between are still simulated"))
     st.slider("Jump to bar", 1, len(df), i+1, key="jump", on_change=lambda: step_to(st.session_state.jump-1))
 
     st.divider()
@@ -244,4 +216,24 @@ with col_top2:
     st.metric("Realized P&L", f"{s.pnl_realized:,.2f}")
     st.metric("Drawdown", f"{s.drawdown:,.2f}")
 
-st.caption(f"Bar {i+1}/{len(df)}  —  O:{st.session_state.open[i]:.2f}  H:{st.session_state.high[i]:.2f}  L:{st.session_state.low[i]:.2f}  C:{st.session_state.close[i]:.2f}")
+    with st.expander("Performance"):
+        with prof().span("analytics"):
+            curve = st.session_state.broker.recorder.bars()
+            stats = summary(curve["equity"], curve["pos"], curve["close"], curve["pnl_realized"], st.session_state.periods)
+        p1, p2 = st.columns(2)
+        p1.metric("Sharpe", f"{stats['sharpe']:.2f}"); p2.metric("Sortino", f"{stats['sortino']:.2f}")
+        p1.metric("CAGR", f"{stats['cagr']:.2%}"); p2.metric("Volatility", f"{stats['volatility']:.2%}")
+        p1.metric("Max DD", f"{stats['max_drawdown_pct']:.2%}"); p2.metric("DD bars", f"{stats['max_drawdown_bars']:,}")
+        p1.metric("Exposure", f"{stats['exposure']:.1%}"); p2.metric("Turnover", f"{stats['turnover']:.2f}x")
+        p1.metric("Win rate", f"{stats['win_rate']:.1%}"); p2.metric("Expectancy", f"{stats['expectancy']:,.2f}")
+        st.caption(f"{stats['trades']} closing trades; P&L per trade excludes fees")
+
+if prof().enabled:
+    with st.expander("Debug: timings (this session)", expanded=True):
+        st.dataframe(pd.DataFrame(prof().report()), use_container_width=True, hide_index=True)
+        if prof().counters: st.json(prof().counters)
+        st.caption("Shared dataset/indicator cache (process-wide)")
+        st.json(SHARED.stats())
+        d1, d2 = st.columns(2)
+        d1.download_button("Download trace (.json)", json.dumps(prof().trace()), file_name="backtester_trace.json", mime="application/json")
+        if d2.button("Reset timings"): prof().reset()
@@ -0,0 +1,43 @@
+import os, shutil
+import pandas as pd
+import pytest
+
+from backtester_p2.io.csv_loader import load_ohlcv
+
+# load_ohlcv with a cache directory must return what it returns without one, on a miss and
+# on the hit that follows.
+
+SAMPLE = os.path.join(os.path.dirname(__file__), "..", "backtester_p2", "data", "sample.csv")
+
+def _roundtrip(path, cache_dir):
+    plain, meta = load_ohlcv(path)
+    for _ in range(2):                                   # miss (stores), then hit
+        df, m = load_ohlcv(path, cache_dir=cache_dir)
+        pd.testing.assert_frame_equal(df, plain)
+        assert m == meta
+    return plain
+
+def _variant(tmp_path, name, **extra):
+    df = pd.read_csv(SAMPLE)
+    for k, v in extra.items(): df[k] = v
+    p = tmp_path / name; df.to_csv(p, index=False)
+    return str(p)
+
+def test_sample_roundtrip(tmp_path):
+    _roundtrip(SAMPLE, str(tmp_path / "cache"))
+    assert os.listdir(tmp_path / "cache" / "data")
+
+def test_extra_columns_do_not_share_an_entry(tmp_path):
+    cache = str(tmp_path / "cache")
+    plain = shutil.copy(SAMPLE, tmp_path / "plain.csv")
+    _roundtrip(str(plain), cache)
+    df = _roundtrip(_variant(tmp_path, "num.csv", Shares=2.5), cache)
+    assert "Shares" in df
+    df = _roundtrip(_variant(tmp_path, "sym.csv", Sym="ABC"), cache)
+    assert (df["Sym"] == "ABC").all()
+
+def test_unmappable_dates_roundtrip(tmp_path):
+    df = pd.read_csv(SAMPLE); df["Date"] = df["Date"] + "T00:00:00+00:00"
+    p = tmp_path / "tz.csv"; df.to_csv(p, index=False)
+    out = _roundtrip(str(p), str(tmp_path / "cache"))
+    assert out["Date"].dt.tz is not None
@@ -0,0 +1,78 @@
+import os
+import numpy as np
+import pytest
+
+from backtester_p2.bench.synth import synthetic_ohlcv
+from backtester_p2.engine.shared import COMPACT, as_columns, compute_indicators
+from backtester_p2.io.csv_loader import load_ohlcv
+from backtester_p2.sim.broker import Broker
+from backtester_p2.sim.config import SimConfig
+from backtester_p2.sim.orders import Order, Side
+from backtester_p2.sim.recorder import Recorder
+
+# Compact (float32) storage against the float64 path, with the bounds documented in
+# engine/shared.py.
+
+SAMPLE = os.path.join(os.path.dirname(__file__), "..", "backtester_p2", "data", "sample.csv")
+
+def _synthetic():
+    df = synthetic_ohlcv(200_000, seed=3)
+    return df, {"checksum": "synthetic"}
+
+def _sample():
+    return load_ohlcv(SAMPLE)
+
+@pytest.fixture(params=[_synthetic, _sample], ids=["synthetic", "sample"])
+def pair(request):
+    df, meta = request.param()
+    return as_columns(df, meta, float), as_columns(df, meta, COMPACT)
+
+def _rel(a, b):
+    ok = ~np.isnan(b)
+    assert (np.isnan(a) == np.isnan(b)).all()
+    if not ok.any(): return 0.0                         # e.g. SMA200 over the 178-bar sample
+    return np.max(np.abs(a[ok].astype(float) - b[ok]) / np.abs(b[ok]))
+
+def test_compact_columns(pair):
+    full, small = pair
+    for k in ("open", "high", "low", "close"):
+        assert small[k].dtype == np.float32 and full[k].dtype == np.float64
+        assert _rel(small[k], full[k]) <= 6e-8
+    assert small["dates"].dtype == full["dates"].dtype
+    assert np.shares_memory(small["df"]["Close"].to_numpy(), small["close"])
+
+def test_compact_indicators(pair):
+    full, small = pair
+    a = compute_indicators(full["high"], full["low"], full["close"], dtype=float)
+    b = compute_indicators(small["high"], small["low"], small["close"], dtype=COMPACT)
+    assert a.keys() == b.keys()
+    for k in a:
+        assert b[k].dtype == np.float32
+        if k.startswith("rsi"):
+            ok = ~np.isnan(a[k])
+            assert (np.isnan(b[k]) == ~ok).all()
+            assert np.max(np.abs(b[k][ok] - a[k][ok])) < 2e-3, k
+        else:
+            assert _rel(b[k], a[k]) < 2e-7, k
+
+def _equity(data, signal, cfg):
+    o, h, l, c = (data[k] for k in ("open", "high", "low", "close"))
+    b = Broker(cfg, recorder=Recorder(c))
+    for i in range(len(c)):
+        b.seek(i, o, h, l, c)
+        if signal[i]: b.place(Order(ts_index=i, side=Side.BUY if signal[i] > 0 else Side.SELL, qty=1.0))
+    assert b.recorder.close is c                        # the caller's column, no float64 copy
+    return b.recorder.bars()["equity"], b.state.equity
+
+def test_compact_equity(pair):
+    full, small = pair
+    n = min(len(full["close"]), 20_000)
+    full = {k: full[k][:n] for k in ("open", "high", "low", "close")}
+    small = {k: small[k][:n] for k in ("open", "high", "low", "close")}
+    signal = np.zeros(n, int); signal[5::40] = 1; signal[25::40] = -1; signal[30::80] = -1; signal[35::80] = 1
+    cfg = SimConfig(cash=10_000.0, fee_bps=1.0, slip_bps=2.0, policy="next_open")
+    ea, fa = _equity(full, signal, cfg)
+    eb, fb = _equity(small, signal, cfg)
+    assert eb.dtype == np.float64
+    assert np.max(np.abs(eb - ea) / np.abs(ea)) < 1e-8
+    assert abs(fb - fa) / abs(fa) < 1e-8
@@ -0,0 +1,40 @@
+import numpy as np
+
+from backtester_p2.sim.config import SimConfig
+from backtester_p2.sim.strategy import SmaTrend, Strategy, run_strategy
+
+# run_strategy settles order-free bars in bulk (Broker.mark_range); the broker it returns must
+# still rewind (Broker.seek) to the same states a bar-by-bar run passes through. A rewind
+# drops the orders placed after the bar it goes back to, so the seeks only go backwards.
+
+CFG = SimConfig(cash=10_000.0, fee_bps=1.0, slip_bps=2.0, policy="next_open")
+
+def _ohlc(n=600, seed=5):
+    rng = np.random.default_rng(seed)
+    c = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    o = np.r_[c[0], c[:-1]]
+    return o, np.maximum(o, c) * 1.002, np.minimum(o, c) * 0.998, c
+
+def _state(b):
+    s = b.state
+    return (b.bar, s.cash, s.pos.qty, s.pnl_realized, s.equity)
+
+class BuyAt(Strategy):
+    def __init__(self, bar): self.bar = bar
+    def on_bar(self, ctx):
+        if ctx.i == self.bar: ctx.buy(1)
+
+def test_seek_before_an_order_on_a_skipped_bar():
+    o, h, l, c = _ohlc(100)
+    b = run_strategy(BuyAt(50), o, h, l, c, CFG)["broker"]
+    assert b.state.pos.qty == 1.0
+    b.seek(10, o, h, l, c)
+    assert b.bar == 10 and b.state.pos.qty == 0.0 and b.state.cash == CFG.cash
+
+def test_rewinds_match_truncated_runs():
+    o, h, l, c = _ohlc()
+    b = run_strategy(SmaTrend(20), o, h, l, c, CFG)["broker"]
+    for j in (590, 401, 400, 250, 37, 0):
+        b.seek(j, o, h, l, c)
+        ref = run_strategy(SmaTrend(20), o[:j + 1], h[:j + 1], l[:j + 1], c[:j + 1], CFG)["broker"]
+        np.testing.assert_allclose(_state(b), _state(ref), rtol=1e-12, err_msg=str(j))
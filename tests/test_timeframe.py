@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtester_p2.bench.synth import synthetic_ohlcv
+from backtester_p2.engine.shared import COMPACT, SharedArrays, as_columns
+from backtester_p2.engine.timeframe import Resampled, resample, resampled
+
+# Resampled bars against pandas' resample, built at once and appended in pieces.
+
+AGG = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+@pytest.fixture(scope="module")
+def daily():
+    return synthetic_ohlcv(800, seed=1, freq="D")
+
+def _cols(df):
+    return df["Date"].to_numpy(), *(df[k].to_numpy() for k in ("Open", "High", "Low", "Close", "Volume"))
+
+@pytest.mark.parametrize("rule", ["W", "2W", "W-MON", "ME", "2ME", "QE", "3QE", "YE", "3D"])
+def test_matches_pandas(daily, rule):
+    ref = daily.set_index("Date").resample(rule).agg(AGG).dropna()
+    bars = resample(*_cols(daily), rule=rule).bars()
+    assert len(bars["close"]) == len(ref)
+    for k, name in (("open", "Open"), ("high", "High"), ("low", "Low"), ("close", "Close"), ("vol", "Volume")):
+        np.testing.assert_allclose(bars[k], ref[name].to_numpy(), err_msg=k)
+    r = Resampled(rule)
+    for a, b in ((0, 37), (37, 400), (400, 401), (401, 800)):
+        r.append(*_cols(daily.iloc[a:b]))
+    np.testing.assert_array_equal(r.bars()["close"], bars["close"])
+
+def test_unsupported_rule(daily):
+    with pytest.raises(ValueError):
+        resample(*_cols(daily), rule="MS")
+
+def test_cache_keeps_dtypes_apart(daily):
+    store = SharedArrays(); meta = {"checksum": "daily"}
+    full = resampled(as_columns(daily, meta, float), "W", store)
+    small = resampled(as_columns(daily, meta, COMPACT), "W", store)
+    assert full is not small and store.stats()["entries"] == 2
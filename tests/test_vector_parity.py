@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from backtester_p2.sim.broker import Broker
+from backtester_p2.sim.config import SimConfig
+from backtester_p2.sim.orders import Order, Side
+from backtester_p2.sim.vector import run_vectorized
+
+# run_vectorized against the bar-by-bar Broker driven with the same target series: after bar
+# i the difference to target[i] goes in as one MARKET order, which fills on bar i+1.
+
+TOL = 1e-9
+
+def _ohlc(n=400, seed=7):
+    rng = np.random.default_rng(seed)
+    c = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    o = np.r_[c[0], c[:-1]] * (1 + rng.normal(0, 0.002, n))
+    h = np.maximum(o, c) * (1 + rng.uniform(0, 0.005, n))
+    l = np.minimum(o, c) * (1 - rng.uniform(0, 0.005, n))
+    return o, h, l, c
+
+def _targets(n, seed=11):
+    rng = np.random.default_rng(seed)
+    t = np.repeat(rng.choice([-2.0, -1.0, 0.0, 0.0, 1.0, 1.5, 3.0], n // 8 + 1), 8)[:n]
+    t[:20] = 0.0; t[100:140] = 0.0; t[-10:] = 0.0        # flat stretches, including the start and end
+    return t
+
+def _broker_run(o, h, l, c, target, cfg):
+    b = Broker(cfg, checkpoint_every=0)
+    cols = {k: np.empty(len(c)) for k in ("cash", "pos", "equity", "pnl_realized", "avg_price")}
+    for i in range(len(c)):
+        b.process_bar(i, float(o[i]), float(h[i]), float(l[i]), float(c[i]))
+        s = b.state
+        cols["cash"][i] = s.cash; cols["pos"][i] = s.pos.qty; cols["equity"][i] = s.equity
+        cols["pnl_realized"][i] = s.pnl_realized; cols["avg_price"][i] = s.pos.avg_price
+        d = target[i] - s.pos.qty
+        if d: b.place(Order(ts_index=i, side=Side.BUY if d > 0 else Side.SELL, qty=abs(d)))
+    return cols
+
+@pytest.mark.parametrize("policy", ["next_open", "bar_inclusive"])
+@pytest.mark.parametrize("fee_bps,slip_bps", [(0.0, 0.0), (2.5, 0.0), (0.0, 4.0), (3.0, 7.5)])
+def test_matches_broker(policy, fee_bps, slip_bps):
+    o, h, l, c = _ohlc(); t = _targets(len(c))
+    cfg = SimConfig(cash=100_000.0, fee_bps=fee_bps, slip_bps=slip_bps, policy=policy)
+    v = run_vectorized(o, h, l, c, t, cfg)
+    b = _broker_run(o, h, l, c, t, cfg)
+    assert ((v.pos[1:] * v.pos[:-1]) < 0).any() and (v.pos == 0).any()    # direct flips and flat bars covered
+    for k in ("cash", "pos", "equity", "pnl_realized"):
+        np.testing.assert_allclose(getattr(v, k), b[k], rtol=0, atol=TOL * max(1.0, np.abs(b[k]).max()), err_msg=k)
+    held = b["pos"] != 0
+    np.testing.assert_allclose(v.avg_price[held], b["avg_price"][held], rtol=TOL)
+
+def test_fills_at_policy_price():
+    o, h, l, c = _ohlc(60)
+    t = np.zeros(60); t[10:30] = 1.0; t[30:40] = -1.0
+    for policy, ref in (("next_open", o), ("bar_inclusive", c)):
+        v = run_vectorized(o, h, l, c, t, SimConfig(1000.0, 0.0, 10.0, policy))
+        assert v.fill_idx.tolist() == [11, 31, 41]
+        np.testing.assert_allclose(v.fill_price, ref[[11, 31, 41]] * np.array([1.001, 0.999, 1.001]), rtol=TOL)
+
+def test_flat_target_never_trades():
+    o, h, l, c = _ohlc(50)
+    v = run_vectorized(o, h, l, c, np.zeros(50), SimConfig(500.0, 5.0, 5.0, "next_open"))
+    assert len(v.fill_idx) == 0
+    assert (v.cash == 500.0).all() and (v.equity == 500.0).all() and (v.pnl_realized == 0).all()